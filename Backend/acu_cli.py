@@ -0,0 +1,169 @@
+"""
+Batch ACU command runner with a timing report.
+
+Runs a command script non-interactively over serial or TCP. Each command
+goes out as soon as the previous reply has arrived (no fixed sleeps), or,
+on TCP with --window K, while up to K earlier ones are still in flight.
+
+Script format (file or stdin), one command per line:
+  # comment
+  get show
+  get sat
+  sat,SAT1,12000.00,0.00,0.00,113.00,1,5.00
+  dirx,l,100.00,2.00,30.00,2.00
+
+i.e. the frame code followed by its comma-separated data fields.
+
+Examples:
+  python acu_cli.py --serial COM7 script.txt
+  python acu_cli.py --tcp 192.168.0.1:2217 --json - < script.txt
+  python acu_cli.py --tcp 192.168.0.1:2217 --window 8 script.txt
+"""
+import argparse
+import json
+import sys
+import time
+
+from acu_driver import ACUSerial, build_frame, verify_checksum
+from acu_tcp import ACUTcp
+
+
+def parse_script(lines):
+    """Yield (line_no, frame_code, data) for each command line."""
+    for no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = [p.strip() for p in line.split(",")]
+        yield no, parts[0], parts[1:]
+
+
+def open_link(args):
+    if args.tcp:
+        host, _, port = args.tcp.rpartition(":")
+        link = ACUTcp()
+        link.connect(host, int(port), timeout=max(args.timeout, 1.0), window=args.window)
+    else:
+        link = ACUSerial()
+        link.connect(args.serial, baudrate=args.baud, timeout=args.timeout)
+    return link
+
+
+def run(link, commands, frame_type="cmd", retries=3, timeout=0.5, stop_on_error=False):
+    """Send every command in order, yielding one result dict per command."""
+    for no, code, data in commands:
+        frame = build_frame(frame_type, code, *data)
+        start = time.perf_counter()
+        res = {"line": no, "code": code, "frame": frame.strip()}
+        try:
+            resp = link.send_and_read(frame, retries=retries, timeout=timeout)
+            res.update({"ok": True, "response": resp, "checksum_ok": verify_checksum(resp)})
+        except Exception as e:
+            res.update({"ok": False, "error": str(e)})
+        res["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        yield res
+        if stop_on_error and not res["ok"]:
+            break
+
+
+def run_windowed(link, commands, frame_type="cmd", retries=3, timeout=0.5, batch=64):
+    """
+    Like run(), over a pipelined TCP link: commands go out in order with up
+    to link.window in flight. `ms` is each command's own round trip.
+    """
+    commands = list(commands)
+    for i in range(0, len(commands), batch):
+        chunk = commands[i:i + batch]
+        frames = [build_frame(frame_type, code, *data) for _, code, data in chunk]
+        start = time.perf_counter()
+        replies = link.send_many(frames, retries=retries, timeout=timeout)
+        for (no, code, _), frame, resp in zip(chunk, frames, replies):
+            res = {"line": no, "code": code, "frame": frame.strip()}
+            if isinstance(resp, Exception):
+                res.update({"ok": False, "error": str(resp),
+                            "ms": round((time.perf_counter() - start) * 1000, 2)})
+            else:
+                res.update({"ok": True, "response": resp, "checksum_ok": verify_checksum(resp),
+                            "ms": round(resp.rtt * 1000, 2)})
+            yield res
+
+
+def summarize(results, elapsed):
+    lat = sorted(r["ms"] for r in results)
+
+    def pct(p):
+        return lat[min(len(lat) - 1, int(p * len(lat)))] if lat else None
+
+    ok = sum(1 for r in results if r["ok"])
+    return {
+        "commands": len(results),
+        "ok": ok,
+        "failed": len(results) - ok,
+        "bad_checksum": sum(1 for r in results if r["ok"] and not r["checksum_ok"]),
+        "total_s": round(elapsed, 3),
+        "commands_per_s": round(len(results) / elapsed, 2) if elapsed > 0 else None,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "max_ms": lat[-1] if lat else None,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run an ACU command script and report timing.")
+    target = ap.add_mutually_exclusive_group(required=True)
+    target.add_argument("--serial", metavar="PORT", help="serial port, e.g. COM7 or /dev/ttyUSB0")
+    target.add_argument("--tcp", metavar="HOST:PORT", help="TCP target, e.g. 192.168.0.1:2217")
+    ap.add_argument("--baud", type=int, default=38400)
+    ap.add_argument("--timeout", type=float, default=0.5, help="per-attempt reply timeout, s")
+    ap.add_argument("--retries", type=int, default=3)
+    ap.add_argument("--type", default="cmd", help="frame type (default: cmd)")
+    ap.add_argument("--stop-on-error", action="store_true")
+    ap.add_argument("--window", type=int, default=1,
+                    help="TCP only: commands in flight at once (default 1, stop-and-wait)")
+    ap.add_argument("--json", action="store_true", help="one JSON object per line")
+    ap.add_argument("script", nargs="?", default="-", help="script file, or - for stdin")
+    args = ap.parse_args(argv)
+    if args.window > 1 and not args.tcp:
+        ap.error("--window needs --tcp")
+    if args.window > 1 and args.stop_on_error:
+        ap.error("--stop-on-error needs --window 1: later commands are already sent")
+
+    src = sys.stdin if args.script == "-" else open(args.script, encoding="utf-8")
+    with src:
+        commands = list(parse_script(src))
+
+    acu = open_link(args)
+    results = []
+    start = time.perf_counter()
+    try:
+        if args.window > 1:
+            results_iter = run_windowed(acu, commands, args.type, args.retries, args.timeout)
+        else:
+            results_iter = run(acu, commands, args.type, args.retries, args.timeout, args.stop_on_error)
+        for res in results_iter:
+            results.append(res)
+            if args.json:
+                print(json.dumps(res), flush=True)
+            elif res["ok"]:
+                flag = "" if res["checksum_ok"] else "  [bad checksum]"
+                print(f"{res['line']:>4}  {res['ms']:>8.2f} ms  {res['code']:<12} {res['response']}{flag}")
+            else:
+                print(f"{res['line']:>4}  {res['ms']:>8.2f} ms  {res['code']:<12} ERROR {res['error']}")
+    finally:
+        elapsed = time.perf_counter() - start
+        acu.disconnect()
+
+    summary = summarize(results, elapsed)
+    if args.json:
+        print(json.dumps({"summary": summary}))
+    else:
+        print("-" * 60)
+        print(f"{summary['commands']} commands, {summary['ok']} ok, {summary['failed']} failed"
+              f" in {summary['total_s']} s ({summary['commands_per_s']} cmd/s)")
+        print(f"latency p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms, max {summary['max_ms']} ms")
+
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
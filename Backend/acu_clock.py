@@ -0,0 +1,117 @@
+"""
+ACU clock offset and drift, estimated NTP-style from stamped exchanges.
+
+The ACU reports its time in every $show frame, usually with one-second
+resolution. For a reply stamped (see acu_driver.Reply) with host send
+time s and receive time r, the ACU built it somewhere in [s, r], and its
+clock then read something in [T, T + resolution). So
+
+    T - r  <=  offset  <  T + resolution - s       (offset = ACU - host)
+
+Intersecting these intervals over many frames narrows the offset down to
+about one round trip, even with a 1 s clock: every time the ACU's second
+ticks over between two polls, one side of the interval snaps in. Between
+frames the interval is widened by `max_drift` (a hard bound, so a true
+offset is never cut off); the drift itself, a least-squares slope of the
+offset over the last `window`, only extrapolates the reported estimate.
+An empty intersection means the ACU clock was stepped: start over.
+"""
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+_TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S",
+                 "%d/%m/%Y %H:%M:%S", "%d-%m-%Y %H:%M:%S")
+
+
+def parse_acu_time(s):
+    """
+    ACU time string -> (unix time, resolution in s), or None.
+    Read as UTC; an ACU on local time simply shows a whole-hours offset.
+    """
+    if not s:
+        return None
+    s = s.strip().rstrip(",").strip()
+    frac = ""
+    m = re.match(r"^(.*?:\d{2})\.(\d+)$", s)
+    if m:
+        s, frac = m.group(1), m.group(2)
+    for fmt in _TIME_FORMATS:
+        try:
+            dt = datetime.strptime(s, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+        ts = dt.timestamp() + (float("0." + frac) if frac else 0.0)
+        return ts, 10.0 ** -len(frac)
+    return None
+
+
+class ClockSync:
+    def __init__(self, max_drift=200e-6, window=600.0):
+        self.max_drift = max_drift  # widening of the interval, s/s
+        self.window = window        # drift regression span, s
+        self.reset()
+
+    def reset(self):
+        self.lo = self.hi = None    # current offset interval
+        self.t = None               # host time the interval refers to
+        self.drift = 0.0
+        self.samples = 0
+        self.steps = 0              # ACU clock jumps detected
+        self._history = deque()     # (host time, offset midpoint), one per ~10 s
+
+    def add(self, acu_time, resolution, sent_wall, recv_wall):
+        lo_s = acu_time - recv_wall
+        hi_s = acu_time + resolution - sent_wall
+        now = recv_wall
+
+        if self.lo is None:
+            self.lo, self.hi = lo_s, hi_s
+        else:
+            widen = self.max_drift * max(0.0, now - self.t)
+            lo, hi = max(self.lo - widen, lo_s), min(self.hi + widen, hi_s)
+            if lo > hi:
+                self.steps += 1
+                self._history.clear()
+                self.drift = 0.0
+                lo, hi = lo_s, hi_s
+            self.lo, self.hi = lo, hi
+        self.t = now
+        self.samples += 1
+        self._update_drift(now)
+
+    def _update_drift(self, now):
+        mid = (self.lo + self.hi) / 2
+        if not self._history or now - self._history[-1][0] >= 10.0:
+            self._history.append((now, mid))
+        while self._history and now - self._history[0][0] > self.window:
+            self._history.popleft()
+        n = len(self._history)
+        if n < 3:
+            return
+        mt = sum(t for t, _ in self._history) / n
+        mo = sum(o for _, o in self._history) / n
+        var = sum((t - mt) ** 2 for t, _ in self._history)
+        if var > 0:
+            drift = sum((t - mt) * (o - mo) for t, o in self._history) / var
+            self.drift = max(-self.max_drift, min(self.max_drift, drift))
+
+    def estimate(self, at=None):
+        """{"offset", "error", "drift"} at host time `at` (default: now), or None."""
+        if self.lo is None:
+            return None
+        dt = max(0.0, (at or time.time()) - self.t)
+        return {"offset": (self.lo + self.hi) / 2 + self.drift * dt,
+                "error": (self.hi - self.lo) / 2 + self.max_drift * dt,
+                "drift": self.drift}
+
+    def to_host(self, acu_time):
+        """ACU timestamp -> host wall clock."""
+        est = self.estimate()
+        return None if est is None else acu_time - est["offset"]
+
+    def status(self):
+        est = self.estimate()
+        return {**(est or {"offset": None, "error": None, "drift": None}),
+                "samples": self.samples, "steps": self.steps}
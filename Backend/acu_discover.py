@@ -0,0 +1,82 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import serial
+
+from acu_driver import ACUSerial, build_frame, verify_checksum
+
+# 38400 is the documented default; the rest cover re-configured units
+DISCOVERY_BAUDRATES = (38400, 115200, 57600, 19200, 9600)
+
+PROBE_FRAME = build_frame("cmd", "get show")
+SHOW_REPLY_BYTES = 160  # a full $show line with some room; ~120 in practice
+
+
+def probe_timeout(baud: int, margin=0.15) -> float:
+    """Wire time of the probe and its $show reply at `baud` (10 bits a byte), plus `margin`."""
+    return (len(PROBE_FRAME) + SHOW_REPLY_BYTES) * 10 / baud + margin
+
+
+def probe_port(port: str, baudrates=DISCOVERY_BAUDRATES, timeout=0.15) -> dict:
+    """
+    Open one port and try each baud rate with a `get show` probe.
+    The first reply with a valid checksum wins. Each probe waits for the
+    wire time at its rate plus `timeout` (a 9600 baud $show alone takes
+    ~150 ms).
+
+    A port can only run one baud rate at a time, so rates are tried in
+    turn on an already-open handle; ports are probed in parallel by
+    discover().
+    """
+    result = {"device": port, "ok": False}
+    try:
+        ser = serial.Serial(port=port, baudrate=baudrates[0],
+                            timeout=probe_timeout(baudrates[0], timeout),
+                            write_timeout=probe_timeout(baudrates[0], timeout))
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+
+    try:
+        for baud in baudrates:
+            ser.baudrate = baud
+            ser.timeout = ser.write_timeout = probe_timeout(baud, timeout)
+            ser.reset_input_buffer()
+            start = time.perf_counter()
+            try:
+                ser.write(PROBE_FRAME.encode("ascii"))
+                ser.flush()
+                line = ser.readline().decode("ascii", errors="replace").strip()
+            except serial.SerialException as e:
+                result["error"] = str(e)
+                break
+
+            if line and verify_checksum(line):
+                result.update({
+                    "ok": True,
+                    "baudrate": baud,
+                    "response": line,
+                    "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+                })
+                break
+    finally:
+        ser.close()
+
+    return result
+
+
+def discover(ports=None, baudrates=DISCOVERY_BAUDRATES, timeout=0.15, skip=()):
+    """
+    Probe all candidate ports concurrently.
+    Returns (found, probed) where `found` lists only ports that answered.
+    """
+    if ports is None:
+        ports = [p["device"] for p in ACUSerial.list_ports()]
+    ports = [p for p in ports if p not in skip]
+    if not ports:
+        return [], []
+
+    with ThreadPoolExecutor(max_workers=len(ports)) as pool:
+        probed = list(pool.map(lambda p: probe_port(p, baudrates, timeout), ports))
+
+    return [r for r in probed if r["ok"]], probed
@@ -1,8 +1,15 @@
+import logging
 import serial
 import serial.tools.list_ports
 import threading
 import time
 
+import acu_metrics as metrics
+import acu_trace
+from acu_singleflight import SingleFlight
+
+log = logging.getLogger("acu.link")
+
 CRLF = b"\r\n"
 
 def xor_checksum(payload: str) -> str:
@@ -27,12 +34,76 @@ def build_frame(frame_type: str, frame_code: str, *data_fields: str) -> str:
     csum = xor_checksum(payload[1:])  # exclude $
     return f"{payload},*{csum}\r\n"
 
+def verify_checksum(line: str) -> bool:
+    """
+    True if a received line is $...,*hh with a matching XOR checksum.
+    """
+    s = line.strip()
+    if not s.startswith("$") or "*" not in s:
+        return False
+    payload, csum = s[1:].rsplit("*", 1)
+    csum = csum.strip().lower()
+    try:
+        # build_frame leaves the "," before "*" out of the sum; accept both
+        return csum in (xor_checksum(payload), xor_checksum(payload.rstrip(",")))
+    except UnicodeEncodeError:
+        return False
+
+def frame_code_of(frame) -> str:
+    """
+    Frame code of an outgoing frame:
+      "$cmd,get show,*3f\r\n" -> "get show"
+    """
+    if isinstance(frame, (bytes, bytearray)):
+        frame = frame.decode("ascii", errors="replace")
+    parts = frame.split(",", 2)
+    return parts[1].strip() if len(parts) > 1 else ""
+
+def is_query(frame) -> bool:
+    """Read-only commands ("get ...") are safe to share between callers."""
+    return frame_code_of(frame).lower().startswith("get ")
+
+class Reply(str):
+    """
+    A reply line that also knows when its exchange happened: monotonic and
+    wall clock at the (successful) write and at the end of the reply line.
+    Behaves as a plain str everywhere else.
+    """
+    sent_mono = sent_wall = recv_mono = recv_wall = None
+
+    @classmethod
+    def stamped(cls, line, sent_mono, sent_wall, recv_mono=None, recv_wall=None):
+        r = cls(line)
+        r.sent_mono, r.sent_wall = sent_mono, sent_wall
+        r.recv_mono = time.monotonic() if recv_mono is None else recv_mono
+        r.recv_wall = time.time() if recv_wall is None else recv_wall
+        return r
+
+    @property
+    def rtt(self):
+        if self.sent_mono is None:
+            return None
+        return self.recv_mono - self.sent_mono
+
+    @property
+    def midpoint(self):
+        """Wall-clock time the ACU most likely built the reply: within rtt/2."""
+        if self.sent_wall is None:
+            return None
+        return self.sent_wall + self.rtt / 2
+
+    def stamps(self):
+        return {"sent_mono": self.sent_mono, "sent_wall": self.sent_wall,
+                "recv_mono": self.recv_mono, "recv_wall": self.recv_wall}
+
+
 class ACUSerial:
     mode = "serial"
 
-    def __init__(self):
+    def __init__(self, coalesce_window=0.0):
         self.ser = None
         self.lock = threading.Lock()
+        self.flights = SingleFlight(coalesce_window)
 
     @staticmethod
     def list_ports():
@@ -55,30 +126,71 @@ class ACUSerial:
         if self.ser and self.ser.is_open:
             self.ser.close()
         self.ser = None
+        self.flights.forget()
 
     def is_connected(self):
         return self.ser is not None and self.ser.is_open
 
-    def send_and_read(self, frame: str, retries=3, timeout=0.5):
+    def send_and_read(self, frame: str, retries=3, timeout=0.5, fresh=False):
         if not self.is_connected():
             raise RuntimeError("Serial not connected")
 
+        if is_query(frame):
+            return self.flights.do(frame, lambda: self._exchange(frame, retries, timeout), fresh)
+        try:
+            return self._exchange(frame, retries, timeout)
+        finally:
+            self.flights.forget()  # state may have changed: no pre-command replies
+
+    def _exchange(self, frame: str, retries, timeout):
         raw = frame.encode("ascii")
+        code = frame_code_of(frame)
+        tr = acu_trace.current()
 
-        for _ in range(retries):
+        for attempt in range(retries):
+            if attempt:
+                metrics.RETRIES.labels(self.mode, code).inc()
+            waited = time.perf_counter()
             with self.lock:
-                self.ser.reset_input_buffer()
-                self.ser.write(raw)
-                self.ser.flush()
-
-                start = time.time()
-                while time.time() - start < timeout:
-                    line = self.ser.readline()
-                    if line:
-                        return line.decode("ascii", errors="replace").strip()
-
+                held = time.perf_counter()
+                metrics.LOCK_WAIT_SECONDS.labels(self.mode, code).observe(held - waited)
+                if tr:
+                    tr.add("lock_wait", waited, held, attempt=attempt)
+                try:
+                    self.ser.reset_input_buffer()
+                    sent = time.monotonic(), time.time()
+                    self.ser.write(raw)
+                    self.ser.flush()
+                    metrics.BYTES_SENT.labels(self.mode).inc(len(raw))
+                    wrote = time.perf_counter()
+                    if tr:
+                        tr.add("write", held, wrote, attempt=attempt)
+
+                    start = time.time()
+                    while time.time() - start < timeout:
+                        line = self.ser.readline()
+                        if line:
+                            resp = Reply.stamped(line.decode("ascii", errors="replace").strip(), *sent)
+                            checksum_ok = verify_checksum(resp)
+                            metrics.observe_reply(self.mode, code, held, len(line), checksum_ok)
+                            log.log(logging.DEBUG if checksum_ok else logging.WARNING,
+                                    "TX %s RX %s%s", frame.strip(), resp,
+                                    "" if checksum_ok else " [bad checksum]", extra={"code": code})
+                            if tr:
+                                tr.add("read", wrote, attempt=attempt)
+                            return resp
+                    if tr:
+                        tr.add("read", wrote, attempt=attempt, timeout=True)
+                finally:
+                    metrics.observe_busy(self.mode, time.perf_counter() - held)
+
+            slept = time.perf_counter()
             time.sleep(0.02)
+            if tr:
+                tr.add("retry_sleep", slept, attempt=attempt)
 
+        metrics.TIMEOUTS.labels(self.mode, code).inc()
+        log.warning("TX %s: no reply after %d tries", frame.strip(), retries, extra={"code": code})
         raise TimeoutError("No response after retries")
 
 
@@ -0,0 +1,174 @@
+"""
+Alarm / state-change events computed from the $show stream.
+
+The engine keeps the previous parsed frame and evaluates each rule once
+per new frame, so clients get compact events instead of diffing full
+frames themselves.
+
+Rule kinds:
+  change      field value differs from the previous frame
+  above       numeric field > threshold   (raised / cleared, with hysteresis)
+  below       numeric field < threshold   (raised / cleared, with hysteresis)
+  equals      field == value              (raised / cleared)
+  not_equals  field != value              (raised / cleared)
+  stale       no new frame for `seconds` while connected
+  link_down   the ACU link is not connected
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+
+log = logging.getLogger("acu.events")
+
+# rule severity -> log level of the event record
+SEVERITY_LEVELS = {"info": logging.INFO, "warning": logging.WARNING, "alarm": logging.ERROR}
+
+DEFAULT_RULES = [
+    {"id": "antenna_status", "kind": "change", "field": "antenna_status", "severity": "info"},
+    {"id": "gps_status", "kind": "change", "field": "gps_status", "severity": "info"},
+    {"id": "gps_lost", "kind": "equals", "field": "gps_status", "value": "0", "severity": "alarm"},
+    {"id": "limit_hit", "kind": "not_equals", "field": "limit_info", "value": "0", "severity": "warning"},
+    {"id": "alert", "kind": "not_equals", "field": "alert_info", "value": "0", "severity": "alarm"},
+    {"id": "stale", "kind": "stale", "seconds": 2.0, "severity": "alarm"},
+    {"id": "link_down", "kind": "link_down", "severity": "alarm"},
+    # site specific: enable and tune through PUT /api/events/rules
+    {"id": "agc_low", "kind": "below", "field": "agc_level", "threshold": 0.0,
+     "hysteresis": 1.0, "severity": "warning", "enabled": False},
+    {"id": "pitch_low", "kind": "below", "field": "current_pitch", "threshold": 5.0,
+     "hysteresis": 0.5, "severity": "warning", "enabled": False},
+]
+
+
+def _num(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+class EventEngine:
+    def __init__(self, rules=None, log_size=500):
+        self.rules = []
+        self.log = deque(maxlen=log_size)
+        self.subscribers = set()  # asyncio.Queue per /ws/events client
+        self.prev = None
+        self.last_frame = None    # wall clock of the last frame seen
+        self.connected = False
+        self.active = {}          # rule id -> True while a latched rule is raised
+        self._next_id = 1
+        self.set_rules(rules if rules is not None else DEFAULT_RULES)
+
+    def set_rules(self, rules):
+        self.rules = [dict(r) for r in rules]
+        ids = {r["id"] for r in self.rules}
+        self.active = {k: v for k, v in self.active.items() if k in ids}
+
+    # ---------------- evaluation ----------------
+
+    def on_frame(self, parsed: dict, frame_time=None):
+        now = frame_time or time.time()
+        prev = self.prev
+
+        for r in self.rules:
+            if r["kind"] == "stale" and self.active.get(r["id"]):
+                self._latch(r, False, 0.0, now)
+
+        for r in self.rules:
+            if not r.get("enabled", True) or r["kind"] in ("stale", "link_down"):
+                continue
+            field = r.get("field")
+            value = parsed.get(field)
+
+            if r["kind"] == "change":
+                if prev is not None and value != prev.get(field):
+                    self._emit(r, "change", value, now, previous=prev.get(field))
+                continue
+
+            self._latch(r, self._condition(r, value), value, now)
+
+        self.prev = parsed
+        self.last_frame = now
+
+    def on_tick(self, connected=True):
+        """Called periodically (also without frames) for time-based rules."""
+        now = time.time()
+        if connected and not self.connected and self.last_frame is not None:
+            self.last_frame = now  # staleness counts from (re)connect
+        self.connected = connected
+
+        for r in self.rules:
+            if not r.get("enabled", True):
+                continue
+            if r["kind"] == "link_down":
+                self._latch(r, not connected, connected, now)
+            elif r["kind"] == "stale" and self.last_frame is not None:
+                age = now - self.last_frame
+                self._latch(r, connected and age > r.get("seconds", 2.0), round(age, 1), now)
+
+    def _condition(self, r, value):
+        kind = r["kind"]
+        if kind in ("equals", "not_equals"):
+            if value is None:
+                return self.active.get(r["id"], False)
+            hit = str(value) == str(r.get("value"))
+            return hit if kind == "equals" else not hit
+
+        x = _num(value)
+        if x is None:
+            return self.active.get(r["id"], False)
+        th = float(r.get("threshold", 0.0))
+        hy = float(r.get("hysteresis", 0.0))
+        was = self.active.get(r["id"], False)
+        if kind == "above":
+            return x > (th - hy if was else th)
+        if kind == "below":
+            return x < (th + hy if was else th)
+        return False
+
+    def _latch(self, r, on, value, now):
+        if on == self.active.get(r["id"], False):
+            return
+        self.active[r["id"]] = on
+        self._emit(r, "raised" if on else "cleared", value, now)
+
+    def _emit(self, r, kind, value, now, previous=None):
+        event = {
+            "id": self._next_id,
+            "time": now,
+            "rule": r["id"],
+            "kind": kind,
+            "severity": r.get("severity", "info") if kind != "cleared" else "info",
+            "field": r.get("field"),
+            "value": value,
+        }
+        if kind == "change":
+            event["previous"] = previous
+        self._next_id += 1
+        self.log.append(event)
+        level = SEVERITY_LEVELS.get(event["severity"], logging.INFO)
+        if event["field"]:
+            log.log(level, "%s %s: %s=%s", event["rule"], kind, event["field"], value)
+        else:
+            log.log(level, "%s %s", event["rule"], kind)
+
+        for q in list(self.subscribers):
+            if q.full():
+                q.get_nowait()  # slow client: drop its oldest event
+            q.put_nowait(event)
+
+    # ---------------- readers ----------------
+
+    def recent(self, since=0, limit=100):
+        return [e for e in self.log if e["id"] > since][-limit:]
+
+    def state(self):
+        return {rid: on for rid, on in self.active.items() if on}
+
+    def subscribe(self, maxsize=100):
+        q = asyncio.Queue(maxsize=maxsize)
+        self.subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        self.subscribers.discard(q)
@@ -0,0 +1,271 @@
+"""
+ACU gateway: one process that owns the physical link.
+
+API workers (uvicorn --workers N) talk to it over a Unix-domain socket
+instead of opening the serial port / TCP link themselves, so the port
+has a single owner and every worker sees the same connection state.
+
+Protocol: one JSON object per line, both directions.
+  -> {"op": "send", "frame": "$cmd,get show,*3f\\r\\n", "retries": 3, "timeout": 0.7}
+  <- {"ok": true, "response": "$show,...", "stamps": {"sent_wall": ..., ...}}
+  <- {"ok": false, "error": "TimeoutError", "message": "No response after retries"}
+
+Run:
+  python acu_gateway.py --socket /tmp/acu-gateway.sock
+  ACU_GATEWAY_SOCKET=/tmp/acu-gateway.sock uvicorn main:app --workers 4
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+
+import acu_logstore
+import acu_metrics as metrics
+import acu_trace
+from acu_discover import discover
+from acu_driver import ACUSerial, Reply
+from acu_history import HistoryStore
+from acu_poller import PollRate, ShowPoller
+from acu_state import ShowState
+from acu_tcp import ACUTcp
+
+DEFAULT_SOCKET = "/tmp/acu-gateway.sock"
+
+# exception types that survive the trip back to the worker
+ERRORS = {
+    "TimeoutError": TimeoutError,
+    "RuntimeError": RuntimeError,
+    "ValueError": ValueError,
+}
+
+
+# =========================================================
+# Server side (owns the link)
+# =========================================================
+class ACUGateway:
+    def __init__(self):
+        self.serial = ACUSerial()
+        self.tcp = ACUTcp()
+        self.acu = self.serial  # active driver pointer
+
+    def state(self):
+        return {"connected": self.acu.is_connected(), "mode": self.acu.mode}
+
+    def handle(self, req: dict) -> dict:
+        op = req.get("op")
+
+        if op == "send":
+            resp = self.acu.send_and_read(req["frame"],
+                                          retries=req.get("retries", 3),
+                                          timeout=req.get("timeout", 0.7))
+            return {"response": resp, "stamps": getattr(resp, "stamps", dict)()}
+
+        if op == "state":
+            return self.state()
+
+        if op == "metrics":
+            return {"text": metrics.render()}
+
+        if op == "ports":
+            return {"ports": ACUSerial.list_ports()}
+
+        if op == "discover":
+            skip = [self.serial.ser.port] if self.serial.is_connected() else []
+            found, probed = discover(req.get("ports"), req["baudrates"],
+                                     req.get("timeout", 0.15), skip=skip)
+            return {"found": found, "probed": probed}
+
+        if op == "connect_serial":
+            self.serial.connect(req["port"],
+                                baudrate=req.get("baudrate", 38400),
+                                timeout=req.get("timeout", 0.5))
+            self.serial.flights.window = req.get("coalesce_window", 0.0)
+            self.acu = self.serial
+            return self.state()
+
+        if op == "connect_tcp":
+            self.tcp.connect(req["host"], req["port"], timeout=req.get("timeout", 2.0),
+                             window=req.get("window", 1))
+            self.tcp.flights.window = req.get("coalesce_window", 0.0)
+            self.acu = self.tcp
+            return self.state()
+
+        if op == "disconnect":
+            self.acu.disconnect()
+            return self.state()
+
+        raise ValueError(f"Unknown op: {op}")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        gateway = self.server.gateway
+        for line in self.rfile:
+            try:
+                reply = gateway.handle(json.loads(line))
+                reply["ok"] = True
+            except Exception as e:
+                reply = {"ok": False, "error": type(e).__name__, "message": str(e)}
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class GatewayServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, gateway=None):
+        if os.path.exists(path):
+            os.unlink(path)  # stale socket from a previous run
+        self.gateway = gateway or ACUGateway()
+        super().__init__(path, _Handler)
+
+
+# =========================================================
+# Client side (used by API workers)
+# =========================================================
+class GatewayClient:
+    """
+    Drop-in for ACUSerial / ACUTcp that forwards to the gateway.
+    One socket per calling thread, so concurrent requests don't
+    interleave on the same stream.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.path)
+            conn = self._local.conn = (sock, sock.makefile("rb"))
+        return conn
+
+    def _drop(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn:
+            try:
+                conn[1].close()
+                conn[0].close()
+            except Exception:
+                pass
+
+    def call(self, op, wait=10.0, **kwargs):
+        payload = json.dumps({"op": op, **kwargs}).encode("utf-8") + b"\n"
+
+        for attempt in range(2):  # one transparent reconnect (gateway restarted)
+            try:
+                sock, rfile = self._conn()
+                sock.settimeout(wait)
+                sock.sendall(payload)
+                line = rfile.readline()
+                if not line:
+                    raise ConnectionError("Gateway closed the connection")
+                break
+            except socket.timeout:
+                self._drop()  # reply may still arrive: never resend on a timeout
+                raise TimeoutError("ACU gateway did not answer")
+            except (OSError, ConnectionError):
+                self._drop()
+                if attempt:
+                    raise RuntimeError(f"ACU gateway unavailable at {self.path}")
+
+        reply = json.loads(line)
+        if not reply.pop("ok", False):
+            raise ERRORS.get(reply.get("error"), RuntimeError)(reply.get("message", ""))
+        return reply
+
+    # ---- driver interface ----
+
+    @property
+    def mode(self):
+        return self.call("state")["mode"]
+
+    def is_connected(self):
+        return self.call("state")["connected"]
+
+    def send_and_read(self, frame, retries=3, timeout=0.7):
+        wait = retries * (timeout + 0.25) + 5.0
+        started = time.perf_counter()
+        try:
+            res = self.call("send", wait=wait, frame=frame, retries=retries, timeout=timeout)
+            stamps = res.get("stamps") or {}
+            if stamps.get("sent_wall") is None:
+                return res["response"]
+            # same host: the gateway's monotonic and wall clocks are ours
+            return Reply.stamped(res["response"], stamps["sent_mono"], stamps["sent_wall"],
+                                 stamps["recv_mono"], stamps["recv_wall"])
+        finally:
+            tr = acu_trace.current()
+            if tr:
+                tr.add("gateway", started)
+
+    def connect_serial(self, port, baudrate=38400, timeout=0.5, coalesce_window=0.0):
+        return self.call("connect_serial", port=port, baudrate=baudrate,
+                         timeout=timeout, coalesce_window=coalesce_window)
+
+    def connect_tcp(self, host, port, timeout=2.0, coalesce_window=0.0, window=1):
+        return self.call("connect_tcp", wait=timeout + 10.0, host=host, port=port,
+                         timeout=timeout, coalesce_window=coalesce_window, window=window)
+
+    def disconnect(self):
+        return self.call("disconnect")
+
+    def list_ports(self):
+        return self.call("ports")["ports"]
+
+    def metrics(self):
+        return self.call("metrics")["text"]
+
+    def discover(self, ports, baudrates, timeout):
+        wait = len(baudrates) * (timeout + 0.5) + 5.0
+        return self.call("discover", wait=wait, ports=ports,
+                         baudrates=baudrates, timeout=timeout)
+
+
+# =========================================================
+# Entry point
+# =========================================================
+def main():
+    ap = argparse.ArgumentParser(description="ACU link gateway")
+    ap.add_argument("--socket", default=os.environ.get("ACU_GATEWAY_SOCKET", DEFAULT_SOCKET))
+    ap.add_argument("--poll-interval", type=float, default=0.2,
+                    help="get show period feeding the shared state block (while settling)")
+    ap.add_argument("--fixed-rate", action="store_true",
+                    help="always poll at --poll-interval, ignoring antenna motion")
+    args = ap.parse_args()
+
+    # the gateway owns the link, so driver frames are logged here
+    log_listener = acu_logstore.install(acu_logstore.LogStore())
+
+    server = GatewayServer(args.socket)
+    gateway = server.gateway
+    rate = None if args.fixed_rate else PollRate(normal=args.poll_interval)
+    # ...and so is telemetry history; workers only read it
+    history = HistoryStore().start()
+    poller = ShowPoller(lambda: gateway.acu, ShowState(), interval=args.poll_interval, rate=rate,
+                        consumers=[history.on_frame])
+    poller.start()
+
+    logging.getLogger("acu.gateway").info("ACU gateway listening on %s", args.socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        poller.stop()
+        history.stop()
+        log_listener.stop()
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Telemetry history: every polled $show frame, in tiers.
+
+  raw   one row per frame (5 Hz), kept `ACU_HISTORY_RAW_DAYS` days
+  1s    one row per second  \
+  1m    one row per minute   > per numeric field: count, min, max, sum, last
+  1h    one row per hour    /
+
+Frames come from the poller (so only the process that owns the link
+writes, even with many API workers) through a bounded queue; a writer
+thread inserts them in batches and folds each one into the open bucket
+of every rollup tier, upserting touched buckets on every batch, so
+rollups are live and a restart carries on from the stored partial row.
+Old rows are pruned per tier.
+
+query() picks the coarsest tier whose step still meets the requested
+resolution: a 30-day AGC trend at hourly resolution reads 720 rows, at
+one point per minute 43 k, instead of 13 M frames.
+"""
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+log = logging.getLogger("acu.history")
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "acu_history.sqlite3")
+
+# numeric $show fields (parse_show keys); status codes are not averaged
+FIELDS = (
+    "preset_azimuth", "preset_pitch", "preset_polarization",
+    "current_azimuth", "current_pitch", "current_polarization",
+    "carrier_heading", "carrier_pitch", "carrier_roll",
+    "longitude", "latitude", "agc_level", "az_pot", "pitch_pot",
+)
+
+# tier -> bucket length, s (raw = 0: no bucketing), finest first
+TIERS = {"raw": 0, "1s": 1, "1m": 60, "1h": 3600}
+
+DAY = 86400.0
+# tier -> seconds kept (None = forever)
+RETENTION = {"raw": 7 * DAY, "1s": 30 * DAY, "1m": 365 * DAY, "1h": None}
+
+_AGG = ("n", "min", "max", "sum", "last")
+
+
+def _num(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def sample(parsed: dict) -> dict:
+    return {f: _num(parsed.get(f)) for f in FIELDS}
+
+
+def _schema():
+    raw_cols = ", ".join(f"{f} REAL" for f in FIELDS)
+    sql = [f"CREATE TABLE IF NOT EXISTS raw (time REAL PRIMARY KEY, {raw_cols}) WITHOUT ROWID;"]
+    agg_cols = ", ".join(f"{f}_{a} {'INTEGER' if a == 'n' else 'REAL'}" for f in FIELDS for a in _AGG)
+    for tier in TIERS:
+        if tier != "raw":
+            sql.append(f"CREATE TABLE IF NOT EXISTS rollup_{tier} ("
+                       f"bucket INTEGER PRIMARY KEY, count INTEGER NOT NULL, "
+                       f"last_time REAL NOT NULL, {agg_cols});")
+    return "\n".join(sql)
+
+
+class _Bucket:
+    """Running min/max/sum/last of every field over one rollup bucket."""
+
+    __slots__ = ("count", "last_time", "aggs")
+
+    def __init__(self):
+        self.count = 0
+        self.last_time = float("-inf")
+        self.aggs = {}  # field -> [n, min, max, sum, last]
+
+    @classmethod
+    def from_row(cls, row):
+        b = cls()
+        b.count, b.last_time = row["count"], row["last_time"]
+        for f in FIELDS:
+            if row[f"{f}_n"]:
+                b.aggs[f] = [row[f"{f}_{a}"] for a in _AGG]
+        return b
+
+    def add(self, t, values):
+        self.count += 1
+        newest = t >= self.last_time  # frames can arrive late across a restart
+        if newest:
+            self.last_time = t
+        for f, x in values.items():
+            if x is None:
+                continue
+            a = self.aggs.get(f)
+            if a is None:
+                self.aggs[f] = [1, x, x, x, x]
+                continue
+            a[0] += 1
+            a[1] = min(a[1], x)
+            a[2] = max(a[2], x)
+            a[3] += x
+            if newest:
+                a[4] = x
+
+    def row(self, bucket):
+        out = {"bucket": bucket, "count": self.count, "last_time": self.last_time}
+        for f in FIELDS:
+            a = self.aggs.get(f) or [0, None, None, None, None]
+            out.update({f"{f}_{name}": v for name, v in zip(_AGG, a)})
+        return out
+
+
+class HistoryStore:
+    def __init__(self, path=None, retention=None, flush_every=1.0, queue_size=10_000):
+        self.path = path or os.environ.get("ACU_HISTORY_DB", DEFAULT_PATH)
+        self.retention = dict(RETENTION)
+        if os.environ.get("ACU_HISTORY_RAW_DAYS"):
+            self.retention["raw"] = float(os.environ["ACU_HISTORY_RAW_DAYS"]) * DAY
+        self.retention.update(retention or {})
+        self.flush_every = flush_every
+        self.dropped = 0                       # frames lost to a full queue
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+        self._open = {tier: {} for tier in TIERS if tier != "raw"}  # writer thread only
+        self._last_prune = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._db().executescript(_schema())
+
+    def _db(self):
+        # one connection per thread: the writer inserts, request threads read
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------------- producer (poller thread) ----------------
+
+    def on_frame(self, parsed: dict, frame_time=None):
+        """Frame consumer: never blocks, drops (and counts) when the writer lags."""
+        values = sample(parsed)
+        if all(v is None for v in values.values()):
+            return
+        try:
+            self._queue.put_nowait((frame_time or time.time(), values))
+        except queue.Full:
+            self.dropped += 1
+
+    # ---------------- writer ----------------
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5.0)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._stop.wait(self.flush_every)
+            self._drain()
+            if time.time() - self._last_prune > 600:
+                self._last_prune = time.time()
+                self._safely(self.prune)
+        self._drain()
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._safely(self.write, batch)
+
+    def _safely(self, fn, *args):
+        try:
+            fn(*args)
+        except Exception as e:
+            log.warning("history %s failed: %s", fn.__name__, e)
+
+    def write(self, batch):
+        """Insert [(frame_time, {field: value})] and fold it into every rollup."""
+        db = self._db()
+        cols = ", ".join(FIELDS)
+        marks = ", ".join(f":{f}" for f in FIELDS)
+        touched = set()
+        insert = f"INSERT OR IGNORE INTO raw (time, {cols}) VALUES (:time, {marks})"
+        with db:
+            for t, values in batch:
+                # OR IGNORE: a frame seen twice (same frame_time) is stored,
+                # and folded into the rollups, once
+                if not db.execute(insert, {"time": t, **dict.fromkeys(FIELDS), **values}).rowcount:
+                    continue
+                for tier, step in TIERS.items():
+                    if not step:
+                        continue
+                    bucket = int(t // step) * step
+                    self._bucket(db, tier, bucket).add(t, values)
+                    touched.add((tier, bucket))
+
+            for tier, bucket in touched:
+                row = self._open[tier][bucket].row(bucket)
+                names = ", ".join(row)
+                db.execute(f"INSERT OR REPLACE INTO rollup_{tier} ({names}) "
+                           f"VALUES ({', '.join(':' + k for k in row)})", row)
+
+        # only the newest bucket of each tier is still filling
+        for buckets in self._open.values():
+            for bucket in sorted(buckets)[:-1]:
+                del buckets[bucket]
+
+    def _bucket(self, db, tier, bucket):
+        buckets = self._open[tier]
+        b = buckets.get(bucket)
+        if b is None:
+            # carry on from a row stored before a restart (or a late frame)
+            row = db.execute(f"SELECT * FROM rollup_{tier} WHERE bucket = ?", (bucket,)).fetchone()
+            b = buckets[bucket] = _Bucket.from_row(row) if row else _Bucket()
+        return b
+
+    def prune(self, now=None):
+        now = now or time.time()
+        db = self._db()
+        with db:
+            for tier, keep in self.retention.items():
+                if keep is None:
+                    continue
+                column = "time" if tier == "raw" else "bucket"
+                table = "raw" if tier == "raw" else f"rollup_{tier}"
+                db.execute(f"DELETE FROM {table} WHERE {column} < ?", (now - keep,))
+
+    # ---------------- readers ----------------
+
+    @staticmethod
+    def pick_tier(resolution):
+        """Coarsest tier whose bucket is no longer than `resolution` seconds."""
+        best = "raw"
+        for tier, step in TIERS.items():
+            if step and step <= resolution:
+                best = tier
+        return best
+
+    def query(self, since=None, until=None, fields=None, resolution=None,
+              max_points=1000, limit=100_000):
+        """
+        Oldest first, between `since` and `until` (unix time; default the
+        last hour). `resolution`: wanted seconds per point, default the
+        span / `max_points`. Raw items carry plain values; rollup items
+        carry {min, max, mean, last} (None where a field had no data).
+        """
+        until = time.time() if until is None else until
+        since = until - 3600.0 if since is None else since
+        if since > until:
+            raise ValueError("since is after until")
+        fields = list(fields or FIELDS)
+        unknown = [f for f in fields if f not in FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        if resolution is None:
+            resolution = (until - since) / max(1, max_points)
+        limit = max(1, min(int(limit), 1_000_000))
+
+        tier = self.pick_tier(resolution)
+        db = self._db()
+        if tier == "raw":
+            rows = db.execute(
+                f"SELECT time, {', '.join(fields)} FROM raw WHERE time >= ? AND time <= ? "
+                f"ORDER BY time LIMIT ?", (since, until, limit + 1)).fetchall()
+            items = [dict(r) for r in rows[:limit]]
+        else:
+            step = TIERS[tier]
+            cols = ", ".join(f"{f}_{a}" for f in fields for a in _AGG)
+            rows = db.execute(
+                f"SELECT bucket, count, {cols} FROM rollup_{tier} "
+                f"WHERE bucket >= ? AND bucket <= ? ORDER BY bucket LIMIT ?",
+                (int(since // step) * step, until, limit + 1)).fetchall()
+            items = []
+            for r in rows[:limit]:
+                item = {"time": r["bucket"], "count": r["count"]}
+                for f in fields:
+                    n = r[f"{f}_n"]
+                    item[f] = {"min": r[f"{f}_min"], "max": r[f"{f}_max"],
+                               "mean": r[f"{f}_sum"] / n if n else None,
+                               "last": r[f"{f}_last"]}
+                items.append(item)
+
+        return {"tier": tier, "step": TIERS[tier], "since": since, "until": until,
+                "fields": fields, "items": items, "truncated": len(rows) > limit}
@@ -0,0 +1,141 @@
+import asyncio
+
+# manual,<direction_code>,<speed> -> axis it drives
+DIRECTION_AXIS = {
+    "L": "az", "R": "az",
+    "U": "pitch", "D": "pitch",
+    "CW": "pol", "CCW": "pol",
+}
+
+# dirx,<sport_type>,... -> axis it drives
+SPORT_AXIS = {"a": "az", "e": "pitch", "p": "pol", "l": "all"}
+
+
+class JogScheduler:
+    """
+    Latest-wins jog sender for one /ws/control client.
+
+    Pending commands are kept per axis; a newer command for the same
+    axis replaces the older one instead of queueing behind it. Pending
+    commands are flushed every `interval` seconds, so the send rate is
+    fixed no matter how fast the client pushes updates.
+
+    Dead-man: if the client goes silent for `deadman` seconds while a
+    jog is active, `stop` is sent.
+
+    Every frame goes out under one ordering lock, and `stop` bumps a
+    generation first: jogs taken before a stop are dropped, never sent
+    after it.
+    """
+
+    def __init__(self, send, on_result=None, interval=0.05, deadman=1.0):
+        if interval <= 0 or deadman <= 0:
+            raise ValueError("interval and deadman must be positive")
+        self.send = send              # blocking: send(frame_code, data) -> (frame, resp)
+        self.on_result = on_result    # async: on_result(dict)
+        self.interval = interval
+        self.deadman = deadman
+
+        self.pending = {}             # axis -> (frame_code, data)
+        self.moving = False
+        self.sent = 0
+        self.coalesced = 0
+
+        self._wake = asyncio.Event()
+        self._order = asyncio.Lock()  # one frame on its way at a time, in order
+        self._gen = 0                 # bumped by stop(): older batches are void
+        self._loop = asyncio.get_running_loop()
+        self._last_seen = self._loop.time()
+        self._next_send = self._loop.time()
+
+    # ---------------- client side ----------------
+
+    def touch(self):
+        """Any client message (including ping) keeps the dead-man alive."""
+        self._last_seen = self._loop.time()
+
+    def jog_speed(self, direction_code: str, speed: float):
+        code = direction_code.upper()
+        axis = DIRECTION_AXIS.get(code, code)
+        self._put(axis, "manual", [code, f"{speed:.2f}"])
+
+    def jog_dirx(self, sport_type: str, data):
+        axis = SPORT_AXIS.get(sport_type, sport_type)
+        if axis == "all":
+            self.coalesced += len(self.pending)
+            self.pending.clear()
+        self._put(axis, "dirx", [sport_type, *data])
+
+    async def stop(self, reason="client"):
+        """Send stop right away, dropping anything still pending."""
+        self._gen += 1
+        self.coalesced += len(self.pending)
+        self.pending.clear()
+        async with self._order:
+            self.moving = False
+            await self._send("stop", [], reason=reason)
+
+    def _put(self, axis, frame_code, data):
+        self.touch()
+        if axis in self.pending:
+            self.coalesced += 1
+            del self.pending[axis]  # re-insert so flush order follows arrival
+        self.pending[axis] = (frame_code, data)
+        self._wake.set()
+
+    # ---------------- sender ----------------
+
+    async def run(self):
+        while True:
+            if not self.pending:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.deadman / 4)
+                except asyncio.TimeoutError:
+                    pass
+
+            now = self._loop.time()
+            if self.moving and now - self._last_seen > self.deadman:
+                await self.stop(reason="deadman")
+                continue
+
+            if not self.pending:
+                continue
+
+            delay = self._next_send - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_send = self._loop.time() + self.interval
+
+            batch = list(self.pending.values())
+            self.pending.clear()
+            gen = self._gen
+            for frame_code, data in batch:
+                async with self._order:
+                    if self._gen != gen:
+                        break  # a stop got in first: the rest of the batch is void
+                    self.moving = True
+                    await self._send(frame_code, data)
+
+    async def close(self):
+        """Client went away: never leave the antenna jogging."""
+        self.pending.clear()
+        if self.moving:
+            await self.stop(reason="disconnect")
+
+    async def _send(self, frame_code, data, reason=None):
+        msg = {"frame_code": frame_code}
+        if reason:
+            msg["reason"] = reason
+        try:
+            frame, resp = await asyncio.to_thread(self.send, frame_code, data)
+            self.sent += 1
+            msg.update({"frame": frame, "response": resp})
+        except Exception as e:
+            msg["error"] = str(e)
+
+        if self.on_result is not None:
+            try:
+                await self.on_result(msg)
+            except Exception:
+                pass
@@ -0,0 +1,204 @@
+"""
+Backend log store: every record from the "acu" loggers (driver frames,
+endpoints, events) lands in a bounded in-memory ring and in SQLite.
+
+Loggers never block on storage: records go through a QueueHandler into
+a bounded queue (dropped, and counted, when full) and a QueueListener
+thread does all the SQLite work. Rows carry the frame code and level
+(both indexed, like time), so /api/logs can search and page without
+the browser keeping everything.
+
+In code, attach the frame code with `extra={"code": frame_code}`.
+"""
+import logging
+import logging.handlers
+import os
+import queue
+import sqlite3
+import threading
+from collections import deque
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "acu_logs.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    time    REAL    NOT NULL,
+    levelno INTEGER NOT NULL,
+    level   TEXT    NOT NULL,
+    logger  TEXT    NOT NULL,
+    code    TEXT,
+    message TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS logs_time ON logs (time);
+CREATE INDEX IF NOT EXISTS logs_code ON logs (code, id);
+CREATE INDEX IF NOT EXISTS logs_level ON logs (levelno, id);
+"""
+
+
+def _levelno(level):
+    if level is None or level == "":
+        return None
+    if isinstance(level, int) or str(level).isdigit():
+        return int(level)
+    no = logging.getLevelName(str(level).upper())
+    if not isinstance(no, int):
+        raise ValueError(f"Unknown level: {level}")
+    return no
+
+
+class LogStore:
+    def __init__(self, path=None, ring_size=2000, max_rows=200_000):
+        self.path = path or os.environ.get("ACU_LOG_DB", DEFAULT_PATH)
+        self.ring = deque(maxlen=ring_size)   # newest rows, for cheap tail reads
+        self.max_rows = max_rows
+        self.dropped = 0                      # records lost to a full queue
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self._db().executescript(SCHEMA)
+
+    def _db(self):
+        # one connection per thread: the listener writes, request threads read
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------------- writer (listener thread) ----------------
+
+    def add(self, record: logging.LogRecord):
+        row = {
+            "time": record.created,
+            "levelno": record.levelno,
+            "level": record.levelname,
+            "logger": record.name,
+            "code": getattr(record, "code", None),
+            "message": record.getMessage(),
+        }
+        db = self._db()
+        with db:
+            cur = db.execute(
+                "INSERT INTO logs (time, levelno, level, logger, code, message)"
+                " VALUES (:time, :levelno, :level, :logger, :code, :message)", row)
+        row["id"] = cur.lastrowid
+        with self._lock:
+            self.ring.append(row)
+
+        self._writes += 1
+        if self.max_rows and self._writes % 1000 == 0:
+            with db:
+                db.execute("DELETE FROM logs WHERE id <= ?", (row["id"] - self.max_rows,))
+
+    # ---------------- readers ----------------
+
+    def query(self, since=None, code=None, level=None, limit=100, cursor=None):
+        """
+        Newest first. `since`: unix time lower bound; `level`: minimum
+        level (name or number); `cursor`: only rows older than this id
+        (pass the previous page's next_cursor).
+        """
+        limit = max(1, min(int(limit), 1000))
+        levelno = _levelno(level)
+
+        def match(r):
+            return ((since is None or r["time"] >= since)
+                    and (code is None or r["code"] == code)
+                    and (levelno is None or r["levelno"] >= levelno)
+                    and (cursor is None or r["id"] < cursor))
+
+        with self._lock:
+            ring = list(self.ring)
+
+        items = None
+        if ring and self._ring_is_tail(ring):
+            found = [r for r in reversed(ring) if match(r)][:limit + 1]
+            # enough rows, or the ring reaches back past `since`
+            if len(found) > limit or (since is not None and ring[0]["time"] < since):
+                items = found
+        if items is None:
+            items = self._select(since, code, levelno, cursor, limit + 1)
+
+        next_cursor = items[limit - 1]["id"] if len(items) > limit else None
+        return {"items": items[:limit], "next_cursor": next_cursor}
+
+    def _ring_is_tail(self, ring):
+        """True if the ring is exactly the newest rows of the table (no other writer)."""
+        if ring[-1]["id"] - ring[0]["id"] + 1 != len(ring):
+            return False
+        newest = self._db().execute("SELECT MAX(id) FROM logs").fetchone()[0]
+        return newest == ring[-1]["id"]
+
+    def _select(self, since, code, levelno, cursor, limit):
+        where, args = [], []
+        if since is not None:
+            where.append("time >= ?")
+            args.append(since)
+        if code is not None:
+            where.append("code = ?")
+            args.append(code)
+        if levelno is not None:
+            where.append("levelno >= ?")
+            args.append(levelno)
+        if cursor is not None:
+            where.append("id < ?")
+            args.append(cursor)
+        sql = "SELECT id, time, levelno, level, logger, code, message FROM logs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        rows = self._db().execute(sql, args + [limit]).fetchall()
+        return [dict(r) for r in rows]
+
+
+class _StoreHandler(logging.Handler):
+    def __init__(self, store: LogStore):
+        super().__init__()
+        self.store = store
+
+    def emit(self, record):
+        try:
+            self.store.add(record)
+        except Exception:
+            self.handleError(record)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: a full queue drops the record."""
+
+    def __init__(self, q, store):
+        super().__init__(q)
+        self.store = store
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.store.dropped += 1
+
+
+def install(store: LogStore, logger_name="acu", queue_size=10_000, console_level=logging.INFO):
+    """
+    Route `logger_name` (and its children) through the store; records at
+    `console_level` and above are still printed. Returns the listener.
+    """
+    q = queue.Queue(maxsize=queue_size)
+    console = logging.StreamHandler()
+    console.setLevel(console_level)
+    console.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(q, _StoreHandler(store), console,
+                                              respect_handler_level=True)
+
+    logger = logging.getLogger(logger_name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    for h in list(logger.handlers):
+        if isinstance(h, _DroppingQueueHandler):
+            logger.removeHandler(h)
+    logger.addHandler(_DroppingQueueHandler(q, store))
+    listener.start()
+    return listener
@@ -0,0 +1,235 @@
+"""
+Minimal Prometheus-text metrics (no client library needed).
+
+Hot-path cost is one dict lookup plus a few additions under a lock per
+observation; rendering happens only when /metrics is scraped.
+"""
+import bisect
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY = []
+
+
+def _esc(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(names, values, extra=""):
+    parts = [f'{n}="{_esc(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, doc, labelnames=()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = list(self.samples())
+        if not lines:
+            return ""
+        return (f"# HELP {self.name} {self.doc}\n"
+                f"# TYPE {self.name} {self.kind}\n" + "\n".join(lines) + "\n")
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_fmt_labels(self.labelnames, values)} {child.value:g}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, name, doc, labelnames=(), fn=None):
+        super().__init__(name, doc, labelnames)
+        self.fn = fn  # optional: fn() -> {label values tuple: value}, evaluated at scrape
+
+    def samples(self):
+        if self.fn is None:
+            yield from super().samples()
+            return
+        for values, value in self.fn().items():
+            yield f"{self.name}{_fmt_labels(self.labelnames, values)} {value:g}"
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            acc = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                acc += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _fmt_labels(self.labelnames, values, 'le="%s"' % le)
+                yield f"{self.name}_bucket{labels} {acc}"
+            yield f"{self.name}_sum{_fmt_labels(self.labelnames, values)} {total:g}"
+            yield f"{self.name}_count{_fmt_labels(self.labelnames, values)} {acc}"
+
+
+class BusyWindow:
+    """Seconds the link was busy, in 1 s buckets over the last `span` seconds."""
+
+    def __init__(self, span=60):
+        self.span = span
+        self.busy = [0.0] * span
+        self.stamp = [0] * span
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        sec = int(time.time())
+        i = sec % self.span
+        with self._lock:
+            if self.stamp[i] != sec:
+                self.stamp[i] = sec
+                self.busy[i] = 0.0
+            self.busy[i] += seconds
+
+    def ratio(self):
+        now = int(time.time())
+        with self._lock:
+            total = sum(b for b, s in zip(self.busy, self.stamp) if now - s < self.span)
+        return min(1.0, total / self.span)
+
+
+# =========================================================
+# ACU link (ACUSerial / ACUTcp)
+# =========================================================
+EXCHANGE_SECONDS = Histogram(
+    "acu_exchange_seconds", "Write-to-reply time of one attempt.", ["link", "code"])
+LOCK_WAIT_SECONDS = Histogram(
+    "acu_lock_wait_seconds", "Time spent waiting for the link lock.", ["link", "code"])
+RETRIES = Counter(
+    "acu_retries_total", "Attempts beyond the first.", ["link", "code"])
+TIMEOUTS = Counter(
+    "acu_timeouts_total", "Exchanges that got no reply after all retries.", ["link", "code"])
+CHECKSUM_FAILURES = Counter(
+    "acu_checksum_failures_total", "Replies with a missing or wrong checksum.", ["link", "code"])
+BYTES_SENT = Counter(
+    "acu_bytes_sent_total", "Bytes written to the link.", ["link"])
+BYTES_RECEIVED = Counter(
+    "acu_bytes_received_total", "Reply bytes read from the link.", ["link"])
+BUSY_SECONDS = Counter(
+    "acu_link_busy_seconds_total", "Time the link lock was held.", ["link"])
+PIPELINE_FALLBACKS = Counter(
+    "acu_pipeline_fallbacks_total", "Out-of-order replies that put a pipelined link back to stop-and-wait.", ["link"])
+
+_busy_windows = {}
+
+
+def _busy_ratios():
+    return {(link,): w.ratio() for link, w in list(_busy_windows.items())}
+
+
+BUSY_RATIO = Gauge(
+    "acu_link_busy_ratio", "Fraction of the last 60 s the link was busy.", ["link"],
+    fn=_busy_ratios)
+SHOW_POLL_PERIOD = Gauge(
+    "acu_show_poll_period_seconds", "get show period chosen by the adaptive poller.", ["link"])
+CLOCK_OFFSET = Gauge(
+    "acu_clock_offset_seconds", "ACU clock minus host clock, from $show time.", ["acu"])
+CLOCK_ERROR = Gauge(
+    "acu_clock_offset_error_seconds", "Bound on the clock offset estimate.", ["acu"])
+
+
+def observe_reply(link, code, started, nbytes, checksum_ok):
+    """One attempt got a reply; `started` = perf_counter() at write."""
+    EXCHANGE_SECONDS.labels(link, code).observe(time.perf_counter() - started)
+    BYTES_RECEIVED.labels(link).inc(nbytes)
+    if not checksum_ok:
+        CHECKSUM_FAILURES.labels(link, code).inc()
+
+
+def observe_busy(link, seconds):
+    BUSY_SECONDS.labels(link).inc(seconds)
+    w = _busy_windows.get(link)
+    if w is None:
+        w = _busy_windows.setdefault(link, BusyWindow())
+    w.add(seconds)
+
+
+# =========================================================
+# API layer (main.py)
+# =========================================================
+SEND_FRAME_SECONDS = Histogram(
+    "acu_send_frame_seconds", "send_frame end to end, including queueing.", ["code"])
+SEND_FRAME_ERRORS = Counter(
+    "acu_send_frame_errors_total", "send_frame failures by exception type.", ["code", "error"])
+WS_CLIENTS = Gauge(
+    "acu_ws_clients", "Connected WebSocket clients.", ["path"])
+WS_MESSAGES = Counter(
+    "acu_ws_messages_sent_total", "WebSocket messages sent.", ["path"])
+WS_DROPPED = Counter(
+    "acu_ws_messages_dropped_total", "Messages replaced by a newer one before a slow client took them.", ["path"])
+
+
+def render() -> str:
+    return "".join(m.render() for m in REGISTRY)
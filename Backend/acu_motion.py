@@ -0,0 +1,308 @@
+"""
+Feed-forward vessel motion compensation.
+
+Each $show frame carries the carrier (vessel) attitude. A constant-
+acceleration Kalman filter per axis (heading, pitch, roll) tracks it;
+over the short horizons involved (one command latency, ~0.1-0.3 s) that
+follows ship roll closely without needing its period. The attitude
+predicted for the moment a command takes effect is used to turn the
+satellite's earth-frame look angles into antenna (deck) angles, which are
+sent with `dirx` ahead of the measured motion.
+
+Two things are measured all the time, enabled or not:
+  prediction_error  predicted attitude vs. the attitude later measured
+  pointing_error    reported antenna angles vs. the ideal deck angles for
+                    the measured attitude, split by who was steering
+                    ("acu" = the ACU's own tracking, "feedforward" = us)
+
+Conventions assumed: heading clockwise from north, pitch bow-up positive,
+roll starboard-down positive; antenna azimuth relative to the bow and
+pitch (elevation) relative to the deck.
+"""
+import math
+import threading
+import time
+from collections import deque
+
+from acu_stats import WindowStats
+
+AXES = ("heading", "pitch", "roll")
+EARTH_RADIUS_KM = 6378.137
+GEO_RADIUS_KM = 42164.17
+
+
+def _num(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _wrap180(a):
+    return (a + 180.0) % 360.0 - 180.0
+
+
+# =========================================================
+# Geometry
+# =========================================================
+def look_angles(lat, lon, sat_lon):
+    """Earth-frame (true) azimuth and elevation of a geostationary satellite, deg."""
+    la, lo, sl = math.radians(lat), math.radians(lon), math.radians(sat_lon)
+    px = EARTH_RADIUS_KM * math.cos(la) * math.cos(lo)
+    py = EARTH_RADIUS_KM * math.cos(la) * math.sin(lo)
+    pz = EARTH_RADIUS_KM * math.sin(la)
+    dx, dy, dz = GEO_RADIUS_KM * math.cos(sl) - px, GEO_RADIUS_KM * math.sin(sl) - py, -pz
+
+    e = -math.sin(lo) * dx + math.cos(lo) * dy
+    n = -math.sin(la) * math.cos(lo) * dx - math.sin(la) * math.sin(lo) * dy + math.cos(la) * dz
+    u = math.cos(la) * math.cos(lo) * dx + math.cos(la) * math.sin(lo) * dy + math.sin(la) * dz
+    return math.degrees(math.atan2(e, n)) % 360.0, math.degrees(math.atan2(u, math.hypot(e, n)))
+
+
+def deck_angles(az, el, heading, pitch, roll):
+    """Earth-frame az/el -> azimuth from the bow and elevation above the deck, deg."""
+    a, b = math.radians(az), math.radians(el)
+    x, y, z = math.cos(b) * math.cos(a), math.cos(b) * math.sin(a), -math.sin(b)  # NED
+
+    h, p, r = math.radians(heading), math.radians(pitch), math.radians(roll)
+    x, y = x * math.cos(h) + y * math.sin(h), -x * math.sin(h) + y * math.cos(h)
+    x, z = x * math.cos(p) - z * math.sin(p), x * math.sin(p) + z * math.cos(p)
+    y, z = y * math.cos(r) + z * math.sin(r), -y * math.sin(r) + z * math.cos(r)
+
+    return math.degrees(math.atan2(y, x)) % 360.0, math.degrees(math.asin(max(-1.0, min(1.0, -z))))
+
+
+# =========================================================
+# Attitude filter
+# =========================================================
+class AxisKalman:
+    """
+    Constant-acceleration Kalman filter for one angle, deg.
+    q: white-jerk spectral density (deg^2/s^5); r: measurement variance (deg^2).
+    """
+
+    def __init__(self, q=50.0, r=0.0025, wrap=False):
+        self.q = q
+        self.r = r
+        self.wrap = wrap
+        self.x = None  # [angle, rate, accel]
+        self.P = None
+        self.t = None
+
+    def update(self, t, z):
+        if self.x is None or t - self.t > 5.0:
+            self.x = [z, 0.0, 0.0]
+            self.P = [[self.r, 0.0, 0.0], [0.0, 100.0, 0.0], [0.0, 0.0, 100.0]]
+            self.t = t
+            return
+        dt = t - self.t
+        if dt <= 0:
+            return
+
+        # predict: x = F x, P = F P F' + Q
+        F = [[1.0, dt, 0.5 * dt * dt], [0.0, 1.0, dt], [0.0, 0.0, 1.0]]
+        x = [sum(F[i][k] * self.x[k] for k in range(3)) for i in range(3)]
+        FP = [[sum(F[i][k] * self.P[k][j] for k in range(3)) for j in range(3)] for i in range(3)]
+        P = [[sum(FP[i][k] * F[j][k] for k in range(3)) for j in range(3)] for i in range(3)]
+        q = self.q
+        Q = [[dt ** 5 / 20, dt ** 4 / 8, dt ** 3 / 6],
+             [dt ** 4 / 8, dt ** 3 / 3, dt ** 2 / 2],
+             [dt ** 3 / 6, dt ** 2 / 2, dt]]
+        for i in range(3):
+            for j in range(3):
+                P[i][j] += q * Q[i][j]
+
+        # update with z (H = [1, 0, 0])
+        y = z - x[0]
+        if self.wrap:
+            y = _wrap180(y)
+        s = P[0][0] + self.r
+        K = [P[i][0] / s for i in range(3)]
+        self.x = [x[i] + K[i] * y for i in range(3)]
+        self.P = [[P[i][j] - K[i] * P[0][j] for j in range(3)] for i in range(3)]
+        self.t = t
+
+    def predict(self, t):
+        dt = t - self.t
+        a = self.x[0] + self.x[1] * dt + 0.5 * self.x[2] * dt * dt
+        return a % 360.0 if self.wrap else a
+
+
+# =========================================================
+# Compensator
+# =========================================================
+class MotionCompensator:
+    def __init__(self, send, speed=20.0, min_step=0.05, sport_type="l", window=60.0):
+        self.send = send              # blocking: send(frame_code, data) -> (frame, resp)
+        self.speed = speed            # dirx speed, deg/s
+        self.min_step = min_step      # smaller corrections are not sent, deg
+        self.sport_type = sport_type
+        self.window = window
+
+        self.enabled = False
+        self.target = None            # {"sat_longitude": x} or {"az": x, "el": y} (earth frame)
+        self.latency = None           # fixed command latency, s; None = half the dirx round trip
+        self.filters = {"heading": AxisKalman(wrap=True), "pitch": AxisKalman(), "roll": AxisKalman()}
+
+        self.command_rtt = None       # EWMA of dirx round trips, s
+        self.last_lead = None
+        self.last_prediction = None
+        self.last_command = None
+        self.sent = 0
+        self.error = None
+
+        self._pending = deque(maxlen=200)  # (target time, predicted attitude)
+        self._prev = None                  # (time, measured attitude)
+        self.prediction_error = {a: WindowStats(window) for a in AXES}
+        self.pointing_error = {who: {"az": WindowStats(window), "el": WindowStats(window)}
+                               for who in ("acu", "feedforward")}
+        self.frame_cost = WindowStats(window)  # on_frame time, us
+
+        self._slot = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------------- control ----------------
+
+    def configure(self, enabled, target=None, latency=None, speed=None, min_step=None):
+        if enabled and not target:
+            raise ValueError("A target (sat_longitude or az/el) is needed")
+        self.target = target or self.target
+        self.latency = latency
+        if speed is not None:
+            self.speed = speed
+        if min_step is not None:
+            self.min_step = min_step
+        self.last_command = None
+        self.error = None
+        self.enabled = enabled
+        if enabled and not (self._thread and self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="motion-ff", daemon=True)
+            self._thread.start()
+        elif not enabled and self._thread:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(timeout=2.0)
+
+    # ---------------- per frame (event loop: keep it cheap) ----------------
+
+    def on_frame(self, parsed, frame_time=None):
+        started = time.perf_counter()
+        t = frame_time or time.time()
+        att = {a: _num(parsed.get(f"carrier_{a}")) for a in AXES}
+        if any(v is None for v in att.values()):
+            return
+
+        self._score_predictions(t, att)
+        for a in AXES:
+            self.filters[a].update(t, att[a])
+        self._prev = (t, att)
+
+        earth = self._earth_target(parsed)
+        if earth is not None:
+            self._score_pointing(parsed, earth, att)
+
+        # predict for when a command sent now reaches the ACU; the lead over
+        # the measurement is that latency plus the frame's age
+        latency = self.latency if self.latency is not None else (self.command_rtt or 0.0) / 2
+        target_time = max(t, time.time() + latency)
+        pred = {a: self.filters[a].predict(target_time) for a in AXES}
+        self.last_lead = target_time - t
+        self.last_prediction = {"time": target_time, **{a: round(v, 4) for a, v in pred.items()}}
+        self._pending.append((target_time, pred))
+
+        if self.enabled and earth is not None:
+            az, el = deck_angles(earth[0], earth[1], pred["heading"], pred["pitch"], pred["roll"])
+            last = self.last_command
+            if last is None or abs(_wrap180(az - last[0])) >= self.min_step \
+                    or abs(el - last[1]) >= self.min_step:
+                self.last_command = (az, el)
+                self._slot = (az, el)
+                self._wake.set()
+
+        self.frame_cost.add(t, (time.perf_counter() - started) * 1e6)
+
+    def _earth_target(self, parsed):
+        if not self.target:
+            return None
+        if "az" in self.target:
+            return self.target["az"], self.target["el"]
+        lat, lon = _num(parsed.get("latitude")), _num(parsed.get("longitude"))
+        if lat is None or lon is None:
+            return None
+        return look_angles(lat, lon, self.target["sat_longitude"])
+
+    def _score_predictions(self, t, att):
+        """Compare predictions whose target time has passed with the measured attitude."""
+        if self._prev is None:
+            return
+        t0, att0 = self._prev
+        while self._pending and self._pending[0][0] <= t:
+            tp, pred = self._pending.popleft()
+            if tp < t0:
+                continue  # fell between frames we did not see
+            f = (tp - t0) / (t - t0) if t > t0 else 1.0
+            for a in AXES:
+                d = _wrap180(att[a] - att0[a]) if a == "heading" else att[a] - att0[a]
+                measured = att0[a] + f * d
+                self.prediction_error[a].add(t, _wrap180(pred[a] - measured))
+
+    def _score_pointing(self, parsed, earth, att):
+        cur_az, cur_el = _num(parsed.get("current_azimuth")), _num(parsed.get("current_pitch"))
+        if cur_az is None or cur_el is None:
+            return
+        az, el = deck_angles(earth[0], earth[1], att["heading"], att["pitch"], att["roll"])
+        who = self.pointing_error["feedforward" if self.enabled else "acu"]
+        t = self._prev[0]
+        who["az"].add(t, _wrap180(cur_az - az))
+        who["el"].add(t, cur_el - el)
+
+    # ---------------- sender thread (latest command wins) ----------------
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            cmd, self._slot = self._slot, None
+            if cmd is None or self._stop.is_set():
+                continue
+            az, el = cmd
+            data = [self.sport_type, f"{az:.2f}", f"{self.speed:.2f}", f"{el:.2f}", f"{self.speed:.2f}"]
+            started = time.perf_counter()
+            try:
+                self.send("dirx", data)
+                rtt = time.perf_counter() - started
+                self.command_rtt = rtt if self.command_rtt is None else 0.8 * self.command_rtt + 0.2 * rtt
+                self.sent += 1
+            except Exception as e:
+                self.error = str(e)
+
+    # ---------------- readers ----------------
+
+    def status(self):
+        now = time.time()
+
+        def summary(ws):
+            ws.expire(now)
+            s = ws.summary()
+            s["rms"] = round((s["stddev"] ** 2 + s["mean"] ** 2) ** 0.5, 4) if s["count"] else None
+            return s
+
+        return {
+            "enabled": self.enabled,
+            "target": self.target,
+            "lead": round(self.last_lead, 4) if self.last_lead is not None else None,
+            "command_rtt": round(self.command_rtt, 4) if self.command_rtt is not None else None,
+            "prediction": self.last_prediction,
+            "last_command": self.last_command and {"az": round(self.last_command[0], 3),
+                                                   "el": round(self.last_command[1], 3)},
+            "commands_sent": self.sent,
+            "error": self.error,
+            "window": self.window,
+            "prediction_error": {a: summary(ws) for a, ws in self.prediction_error.items()},
+            "pointing_error": {who: {ax: summary(ws) for ax, ws in d.items()}
+                               for who, d in self.pointing_error.items()},
+            "frame_cost_us": summary(self.frame_cost),
+        }
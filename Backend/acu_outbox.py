@@ -0,0 +1,55 @@
+import asyncio
+
+
+class LatestOutbox:
+    """
+    Outbound slot for one WebSocket client, with latest-value semantics.
+
+    The producer (a polling loop) only ever overwrites the slot; a
+    separate task drains it with `send`. A client that reads slower than
+    the producer writes skips intermediate messages instead of queueing
+    them, so it never delays its producer, the shared poller or other
+    clients. Skipped messages are counted in `dropped`.
+    """
+
+    def __init__(self, send, on_drop=None):
+        self.send = send          # async: send(msg)
+        self.on_drop = on_drop    # called once per overwritten message
+        self.sent = 0
+        self.dropped = 0
+
+        self._msg = None
+        self._pending = False
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def put(self, msg):
+        self.check()
+        if self._pending:
+            self.dropped += 1
+            if self.on_drop:
+                self.on_drop()
+        self._msg = msg
+        self._pending = True
+        self._ready.set()
+
+    def check(self):
+        """Re-raise the sender's error (e.g. WebSocketDisconnect) in the producer."""
+        if self._task.done():
+            exc = None if self._task.cancelled() else self._task.exception()
+            raise exc or ConnectionError("outbox closed")
+
+    async def _run(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            msg, self._msg, self._pending = self._msg, None, False
+            await self.send(msg)
+            self.sent += 1
+
+    async def close(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except (asyncio.CancelledError, Exception):
+            pass
@@ -0,0 +1,222 @@
+import logging
+import os
+import threading
+import time
+
+import acu_metrics as metrics
+from acu_clock import ClockSync, parse_acu_time
+from acu_driver import build_frame, parse_show
+
+SHOW_FRAME = build_frame("cmd", "get show")  # "$cmd,get show,*3f\r\n"
+
+log = logging.getLogger("acu.poller")
+
+
+def _num(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def link_id(acu):
+    """Identifies the ACU behind a driver, for per-ACU clock estimates."""
+    if getattr(acu, "host", None):
+        return f"tcp:{acu.host}:{acu.port}"
+    ser = getattr(acu, "ser", None)
+    if ser is not None:
+        return f"serial:{ser.port}"
+    return acu.mode
+
+
+def _codes(env, default=""):
+    return {c.strip() for c in os.environ.get(env, default).split(",") if c.strip()}
+
+
+class PollRate:
+    """
+    Picks the `get show` period from what the antenna is doing.
+
+      moving  current position changed since the last frame, preset and
+              current differ (slewing / searching), or antenna_status is
+              one of `moving_status`                      -> `fast`
+      idle    no motion for `idle_after` seconds, or antenna_status is
+              one of `stowed_status`                      -> `idle`
+      settle  in between                                  -> `normal`
+
+    The period never drops below the measured exchange time divided by
+    `max_share`, so polling alone never takes more than that share of the
+    link (a 38400 baud $show costs ~45 ms, TCP a few ms).
+
+    Keep `idle` (plus a round trip) well under /api/status's default
+    max_age of 1 s, or idle-time pollers fall through to live exchanges.
+    """
+
+    AXES = ("azimuth", "pitch", "polarization")
+
+    def __init__(self, fast=0.05, normal=0.2, idle=0.5, idle_after=5.0,
+                 motion_eps=0.01, point_eps=0.5, max_share=0.5,
+                 moving_status=None, stowed_status=None):
+        self.fast = fast
+        self.normal = normal
+        self.idle = idle
+        self.idle_after = idle_after
+        self.motion_eps = motion_eps    # deg between frames that counts as moving
+        self.point_eps = point_eps      # preset - current that counts as slewing, deg
+        self.max_share = max_share
+        # antenna_status codes are ACU firmware specific; empty = position only
+        self.moving_status = _codes("ACU_MOVING_STATUS") if moving_status is None else set(moving_status)
+        self.stowed_status = _codes("ACU_STOWED_STATUS") if stowed_status is None else set(stowed_status)
+
+        self.state = "settle"
+        self.exchange_time = None       # EWMA of one get show round trip, s
+        self._last_pos = None
+        self._last_motion = time.monotonic()
+
+    def floor(self):
+        if self.exchange_time is None:
+            return self.fast
+        return max(self.fast, self.exchange_time / self.max_share)
+
+    def _moving(self, parsed):
+        status = parsed.get("antenna_status")
+        if status in self.moving_status:
+            return True
+
+        pos = [_num(parsed.get(f"current_{a}")) for a in self.AXES]
+        last, self._last_pos = self._last_pos, pos
+        if last is not None:
+            for a, b in zip(pos, last):
+                if a is not None and b is not None and abs((a - b + 180.0) % 360.0 - 180.0) > self.motion_eps:
+                    return True
+
+        for a in self.AXES[:2]:
+            preset, current = _num(parsed.get(f"preset_{a}")), _num(parsed.get(f"current_{a}"))
+            if preset is not None and current is not None \
+                    and abs((preset - current + 180.0) % 360.0 - 180.0) > self.point_eps:
+                return True
+        return False
+
+    def observe(self, parsed, exchange_time):
+        """Feed one frame and its round trip; returns the next period, s."""
+        a = 0.2
+        self.exchange_time = exchange_time if self.exchange_time is None \
+            else (1 - a) * self.exchange_time + a * exchange_time
+
+        now = time.monotonic()
+        if self._moving(parsed):
+            self._last_motion = now
+            self.state = "moving"
+        elif parsed.get("antenna_status") in self.stowed_status or now - self._last_motion > self.idle_after:
+            self.state = "idle"
+        else:
+            self.state = "settle"
+        return self.period()
+
+    def period(self):
+        target = {"moving": self.fast, "settle": self.normal, "idle": self.idle}[self.state]
+        return max(target, self.floor())
+
+
+class ShowPoller:
+    """
+    The single `get show` loop for the process that owns the link.
+    Every result goes to the shared ShowState, where /api/status and all
+    /ws/show clients (in any worker) pick it up.
+
+    With a PollRate the period follows the antenna's motion; without one
+    it is a fixed `interval`. Each frame's time field also feeds the
+    clock estimate of the ACU it came from (`clocks`, by link_id).
+    `consumers` get (parsed, frame_time) for every good frame, in this
+    thread, once per frame however many workers there are: keep them cheap.
+
+    Every poll is a real exchange (`fresh`): a reply shared from another
+    caller's exchange would repeat an old reading and fake its timing.
+    """
+
+    def __init__(self, get_acu, state, interval=0.2, rate=None, consumers=()):
+        self.get_acu = get_acu    # returns the active driver (it can change on connect)
+        self.state = state
+        self.interval = interval  # 5 Hz
+        self.rate = rate
+        self.clocks = {}          # link_id -> ClockSync
+        self.consumers = list(consumers)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.state.reset()
+        self._thread = threading.Thread(target=self._run, name="show-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+    def _run(self):
+        last_state = None
+        last_sent = None
+        while not self._stop.is_set():
+            acu = self.get_acu()
+            try:
+                connected = acu.is_connected()
+                mode = acu.mode
+            except Exception:
+                connected, mode = False, "-"
+
+            if not connected:
+                self.state.publish(connected=False, mode=mode)
+                self._stop.wait(1.0)
+                continue
+
+            period = self.interval
+            start = time.perf_counter()
+            try:
+                resp = acu.send_and_read(SHOW_FRAME, 3, 5, fresh=True)
+                sent = getattr(resp, "sent_mono", None)
+                if sent is None or sent != last_sent:
+                    last_sent = sent
+                    parsed = parse_show(resp)
+                    clock = self._clock(acu, parsed, resp)
+                    self.state.publish(raw=resp, mode=mode, clock=clock and clock.estimate())
+                    self._consume(parsed, getattr(resp, "midpoint", None) or time.time())
+                    if self.rate:
+                        period = self.rate.observe(parsed, time.perf_counter() - start)
+                elif self.rate:
+                    period = self.rate.period()  # not a new reading: keep the timing out
+            except Exception as e:
+                self.state.publish(error=str(e), mode=mode)
+
+            if self.rate:
+                metrics.SHOW_POLL_PERIOD.labels(mode).set(period)
+                if self.rate.state != last_state:
+                    last_state = self.rate.state
+                    log.info("show polling %s: every %.3f s", last_state, period)
+
+            # fixed start-to-start period, not a fixed gap after the reply
+            self._stop.wait(max(0.0, period - (time.perf_counter() - start)))
+
+    def _consume(self, parsed, frame_time):
+        for consumer in self.consumers:
+            try:
+                consumer(parsed, frame_time)
+            except Exception as e:
+                log.exception("show consumer failed: %s", e)
+
+    def _clock(self, acu, parsed, resp):
+        acu_time = parse_acu_time(parsed.get("time"))
+        if acu_time is None or getattr(resp, "sent_wall", None) is None:
+            return None
+        clock = self.clocks.get(link_id(acu))
+        if clock is None:
+            clock = self.clocks.setdefault(link_id(acu), ClockSync())
+        # receive time from the monotonic rtt: immune to a wall-clock step mid-exchange
+        clock.add(acu_time[0], acu_time[1], resp.sent_wall, resp.sent_wall + resp.rtt)
+        est = clock.estimate()
+        metrics.CLOCK_OFFSET.labels(link_id(acu)).set(est["offset"])
+        metrics.CLOCK_ERROR.labels(link_id(acu)).set(est["error"])
+        return clock
@@ -0,0 +1,157 @@
+"""
+Named configuration profiles: satellite, place and beacon/DVB LO + gain.
+
+A profile is stored as plain JSON (one file for all profiles). Applying
+one writes every section back-to-back, then reads them all back once and
+compares field by field, so a satellite handover is a single operation
+with a per-step timing and diff report.
+"""
+import json
+import os
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "acu_profiles.json")
+
+# section -> (write frame code, readback frame code), in apply order
+SECTIONS = {
+    "sat": ("sat", "get sat"),
+    "place": ("place", "get place"),
+    "beacon": ("set beacon", "get beacon"),
+    "dvb": ("set dvb", "get dvb"),
+}
+
+
+class ProfileStore:
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("ACU_PROFILES_PATH", DEFAULT_PATH)
+        self._lock = threading.Lock()
+        self.profiles = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.profiles = data
+        except (OSError, ValueError):
+            pass
+
+    def all(self):
+        with self._lock:
+            return dict(self.profiles)
+
+    def get(self, name):
+        with self._lock:
+            return self.profiles.get(name)
+
+    def put(self, name, profile: dict):
+        with self._lock:
+            self.profiles[name] = profile
+            self._save()
+
+    def delete(self, name):
+        with self._lock:
+            found = self.profiles.pop(name, None) is not None
+            if found:
+                self._save()
+            return found
+
+    def _save(self):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.profiles, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+# =========================================================
+# Readback comparison
+# =========================================================
+def reply_fields(resp: str):
+    """$cmd,sat,A,,C,*hh -> ["A", "", "C"]: blank fields keep their place."""
+    s = resp.strip().split("*", 1)[0]
+    fields = [p.strip() for p in s.split(",")[2:]]
+    if fields and fields[-1] == "":
+        fields.pop()  # the empty field before "*"
+    return fields
+
+
+def _decimals(s: str) -> int:
+    return len(s.split(".", 1)[1]) if "." in s else 0
+
+
+def _same(written: str, read: str) -> bool:
+    try:
+        a, b = float(written), float(read)
+    except ValueError:
+        return written.strip().lower() == read.strip().lower()
+    # the ACU may echo fewer decimals than we sent: compare at its precision
+    return abs(a - b) <= 0.5 * 10 ** -min(_decimals(written), _decimals(read)) + 1e-9
+
+
+def diff_fields(written, read):
+    diffs = []
+    for i in range(max(len(written), len(read))):
+        w = written[i] if i < len(written) else None
+        r = read[i] if i < len(read) else None
+        if w is None:
+            continue  # extra readback fields we did not set
+        if r is None or not _same(w, r):
+            diffs.append({"index": i, "written": w, "read": r})
+    return diffs
+
+
+# =========================================================
+# Apply
+# =========================================================
+def apply_profile(send, sections: dict):
+    """
+    sections: {section: [data fields]} for the sections the profile sets.
+    send: blocking send(frame_code, data) -> (frame, resp).
+
+    Writes stop at the first failure; readback still covers every section
+    so the report shows what the ACU actually holds.
+    """
+    t0 = time.perf_counter()
+    order = [s for s in SECTIONS if s in sections]
+    writes, readback = [], []
+
+    failed = False
+    for section in order:
+        code = SECTIONS[section][0]
+        step = {"section": section, "code": code}
+        if failed:
+            step["skipped"] = True
+            writes.append(step)
+            continue
+        start = time.perf_counter()
+        try:
+            frame, resp = send(code, sections[section])
+            step.update({"ok": True, "frame": frame, "response": resp})
+        except Exception as e:
+            step.update({"ok": False, "error": str(e)})
+            failed = True
+        step["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        writes.append(step)
+    t_written = time.perf_counter()
+
+    for section in order:
+        code = SECTIONS[section][1]
+        step = {"section": section, "code": code}
+        start = time.perf_counter()
+        try:
+            frame, resp = send(code, [])
+            diffs = diff_fields(sections[section], reply_fields(resp))
+            step.update({"ok": not diffs, "response": resp, "diffs": diffs})
+        except Exception as e:
+            step.update({"ok": False, "error": str(e)})
+        step["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        readback.append(step)
+    t_done = time.perf_counter()
+
+    return {
+        "ok": all(s.get("ok") for s in writes + readback),
+        "writes": writes,
+        "readback": readback,
+        "write_ms": round((t_written - t0) * 1000, 2),
+        "readback_ms": round((t_done - t_written) * 1000, 2),
+        "total_ms": round((t_done - t0) * 1000, 2),
+    }
@@ -0,0 +1,228 @@
+"""
+ACU TCP simulator, and a pipelining benchmark against it.
+
+Answers get show / get sat / get place / get beacon / get dvb / get ver
+and echoes set commands ($cmd,<code>,ok) like the real unit. Each reply
+leaves `rtt` seconds after its request arrived (the link latency, as
+seen from the host) and the unit handles one command every `service`
+seconds, in order, so pipelined requests overlap on the wire but not in
+the ACU.
+
+Run:
+  python acu_sim.py --port 2217 --rtt 0.15
+  python acu_cli.py --tcp 127.0.0.1:2217 --window 8 script.txt
+
+Benchmark stop-and-wait against pipelined windows at several RTTs:
+  python acu_sim.py --bench
+"""
+import argparse
+import heapq
+import random
+import socket
+import threading
+import time
+
+from acu_driver import build_frame
+from acu_tcp import ACUTcp
+
+
+class SimACU:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.az, self.el = 100.0, 30.0
+        self.config = {
+            "sat": ["SAT1", "12000.00", "0.00", "0.00", "113.00", "1", "5.00"],
+            "place": ["106.8", "-6.2", "0"],
+            "beacon": ["10750", "1.00"],
+            "dvb": ["9750", "2.00"],
+        }
+
+    def reply(self, line: str) -> str:
+        body = line.strip().lstrip("$").split("*", 1)[0]
+        parts = [p.strip() for p in body.split(",")]
+        code = parts[1] if len(parts) > 1 else ""
+        data = [p for p in parts[2:] if p != ""]
+
+        with self.lock:
+            if code == "get show":
+                return build_frame(
+                    "show", f"{self.az:.2f}", f"{self.el:.2f}", "0.00",
+                    f"{self.az:.2f}", f"{self.el:.2f}", "0.00", "3",
+                    "10.0", "0.00", "0.00", "106.8", "-6.2", "1", "0", "0",
+                    f"{40 + random.random():.2f}", "512", "512",
+                    time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()))
+            if code.startswith("get "):
+                key = code[4:]
+                if key == "ver":
+                    return build_frame("cmd", "ver", "sim-1.0")
+                return build_frame("cmd", key, *self.config.get(key, ["0"]))
+            if code == "dirx" and len(data) >= 4:
+                self.az, self.el = float(data[1]), float(data[3])
+            elif code in ("sat", "place"):
+                self.config[code] = data
+            elif code in ("set beacon", "set dvb"):
+                self.config[code[4:]] = data
+            return build_frame("cmd", code, "ok")
+
+
+class SimServer:
+    """
+    TCP front of a SimACU. `drop` / `swap` are the chances that a reply is
+    lost, or sent after the next one, to exercise the pipelining fallback.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, rtt=0.0, service=0.002, drop=0.0, swap=0.0):
+        self.acu = SimACU()
+        self.rtt = rtt
+        self.service = service
+        self.drop = drop
+        self.swap = swap
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen()
+        self.host, self.port = self.sock.getsockname()[:2]
+        self._stop = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="sim-accept", daemon=True).start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        self.sock.close()
+
+    def serve_forever(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            _Connection(self, conn).start()
+
+
+class _Connection:
+    def __init__(self, server, conn):
+        self.server = server
+        self.conn = conn
+        self.outq = []          # heap of (due, seq, bytes)
+        self.seq = 0
+        self.cond = threading.Condition()
+        self.busy_until = 0.0   # the ACU works through commands one at a time
+        self.closed = False
+
+    def start(self):
+        threading.Thread(target=self._read, daemon=True).start()
+        threading.Thread(target=self._write, daemon=True).start()
+
+    def _read(self):
+        buff = b""
+        srv = self.server
+        try:
+            while True:
+                chunk = self.conn.recv(4096)
+                if not chunk:
+                    break
+                buff += chunk
+                while b"\n" in buff:
+                    line, buff = buff.split(b"\n", 1)
+                    if not line.strip():
+                        continue
+                    now = time.monotonic()
+                    self.busy_until = max(now, self.busy_until) + srv.service
+                    reply = srv.acu.reply(line.decode("ascii", errors="replace"))
+                    if random.random() < srv.drop:
+                        continue
+                    due = max(now + srv.rtt, self.busy_until)
+                    if random.random() < srv.swap:
+                        due += 1.5 * srv.service  # lands just after the next reply
+                    with self.cond:
+                        self.seq += 1
+                        heapq.heappush(self.outq, (due, self.seq, reply.encode("ascii")))
+                        self.cond.notify()
+        except OSError:
+            pass
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+    def _write(self):
+        while True:
+            with self.cond:
+                while not self.outq and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    break
+                due, seq, data = self.outq[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue
+                heapq.heappop(self.outq)
+            try:
+                self.conn.sendall(data)
+            except OSError:
+                break
+        self.conn.close()
+
+
+# =========================================================
+# Benchmark
+# =========================================================
+BENCH_SCRIPT = [("get show", []), ("get sat", []), ("get place", []),
+                ("dirx", ["l", "120.00", "2.00", "30.00", "2.00"]), ("get beacon", [])]
+
+
+def bench(rtts=(0.0, 0.02, 0.1, 0.3), windows=(1, 2, 4, 8, 16), commands=100, service=0.002):
+    rows = []
+    for rtt in rtts:
+        server = SimServer(rtt=rtt, service=service).start()
+        for window in windows:
+            n = max(10, int(commands if rtt < 0.1 else commands * 0.1 / rtt))
+            frames = [build_frame("cmd", code, *data)
+                      for code, data in (BENCH_SCRIPT * n)[:n]]
+            link = ACUTcp(window=window)
+            link.connect(server.host, server.port, timeout=2.0, window=window)
+            start = time.perf_counter()
+            replies = link.send_many(frames, retries=1, timeout=rtt + 2.0)
+            elapsed = time.perf_counter() - start
+            link.disconnect()
+            ok = sum(1 for r in replies if not isinstance(r, Exception))
+            rows.append({"rtt_ms": rtt * 1000, "window": window, "commands": n, "ok": ok,
+                         "commands_per_s": n / elapsed})
+        server.close()
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="ACU TCP simulator")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=2217)
+    ap.add_argument("--rtt", type=float, default=0.0, help="reply latency, s")
+    ap.add_argument("--service", type=float, default=0.002, help="ACU time per command, s")
+    ap.add_argument("--drop", type=float, default=0.0, help="chance a reply is lost")
+    ap.add_argument("--swap", type=float, default=0.0, help="chance a reply comes after the next")
+    ap.add_argument("--bench", action="store_true", help="run the pipelining benchmark and exit")
+    args = ap.parse_args(argv)
+
+    if args.bench:
+        print(f"{'rtt ms':>7} {'window':>7} {'cmds':>6} {'ok':>5} {'cmd/s':>9}")
+        for row in bench(service=args.service):
+            print(f"{row['rtt_ms']:>7.0f} {row['window']:>7} {row['commands']:>6} "
+                  f"{row['ok']:>5} {row['commands_per_s']:>9.1f}")
+        return 0
+
+    server = SimServer(args.host, args.port, args.rtt, args.service, args.drop, args.swap)
+    print(f"ACU simulator on {server.host}:{server.port} (rtt {args.rtt * 1000:.0f} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
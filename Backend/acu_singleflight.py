@@ -0,0 +1,79 @@
+import threading
+import time
+
+import acu_trace
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Share one exchange between concurrent callers asking the same thing.
+
+    The first caller for a key runs `fn`; callers arriving while it is in
+    flight wait and get the same result (or exception). A successful
+    result is also reused for `window` seconds after it completed.
+
+    A `fresh` caller (the poller, which needs a new reading every time)
+    never takes a cached or in-flight result; it runs `fn` itself, and
+    its result is shared with later callers as usual.
+    """
+
+    def __init__(self, window=0.0):
+        self.window = window
+        self._lock = threading.Lock()
+        self._calls = {}   # key -> _Call in flight
+        self._recent = {}  # key -> (monotonic done time, result)
+        self._gen = 0      # bumped by forget(); older flights are not cached
+
+    def do(self, key, fn, fresh=False):
+        with self._lock:
+            hit = self._recent.get(key)
+            if not fresh and hit is not None and time.monotonic() - hit[0] <= self.window:
+                return hit[1]
+
+            call = self._calls.get(key)
+            leader = fresh or call is None
+            if leader:
+                call = _Call()
+                self._calls.setdefault(key, call)
+            gen = self._gen
+
+        if not leader:
+            waited = time.perf_counter()
+            call.done.wait()
+            tr = acu_trace.current()
+            if tr:
+                tr.add("coalesced_wait", waited)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                if call.error is None and self.window > 0 and gen == self._gen:
+                    self._recent[key] = (time.monotonic(), call.result)
+            call.done.set()
+
+    def forget(self):
+        """
+        Drop cached results and detach in-flight calls, so later callers
+        start a fresh exchange (link changed, or a command was written).
+        """
+        with self._lock:
+            self._recent.clear()
+            self._calls.clear()
+            self._gen += 1
@@ -0,0 +1,149 @@
+"""
+Latest $show frame in a fixed-layout memory-mapped file.
+
+One writer (the poller, in whichever process owns the link) publishes
+every frame; any number of reader processes (uvicorn workers) read it
+without locks, an ACU exchange or an IPC round trip. Consistency uses a
+seqlock: the writer makes `seq` odd while it updates the block and even
+again when done; a reader retries if `seq` was odd or changed under it.
+
+Layout (little endian):
+  0    u64      seq
+  8    f64      frame_time   wall clock of the last good frame (round-trip midpoint)
+  16   f64      poll_time    wall clock of the last poll attempt
+  24   f64      rtt          round trip of the last good frame, s (NaN = unknown)
+  32   f64      clock_offset ACU clock - host clock, s (NaN = no estimate yet)
+  40   f64      clock_error  +/- bound on clock_offset, s
+  48   f64      clock_drift  d(offset)/dt, s/s
+  56   u8       connected
+  57   u8       ok           last poll returned a frame
+  58   8s       mode         "serial" / "tcp"
+  66   u16      raw_len
+  68   u16      err_len
+  70   [RAW]    raw line of the last good frame
+  ..   [ERR]    error text of the last failed poll
+"""
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "acu_show.state")
+
+RAW_SIZE = 1024
+ERR_SIZE = 256
+
+_SEQ = struct.Struct("<Q")
+_HEAD = struct.Struct("<ddddddBB8sHH")
+_HEAD_OFF = _SEQ.size
+_RAW_OFF = _HEAD_OFF + _HEAD.size
+_ERR_OFF = _RAW_OFF + RAW_SIZE
+SIZE = _ERR_OFF + ERR_SIZE
+
+
+def _nan(v):
+    return math.nan if v is None else v
+
+
+class ShowState:
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("ACU_STATE_PATH", DEFAULT_PATH)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < SIZE:
+                os.ftruncate(fd, SIZE)
+            self.mm = mmap.mmap(fd, SIZE)
+        finally:
+            os.close(fd)
+
+        # writer-side copy of the last good frame, so error updates keep it
+        self._raw = b""
+        self._frame_time = 0.0
+        self._rtt = math.nan
+        self._clock = {}
+
+    # ---------------- writer ----------------
+
+    def publish(self, raw=None, error=None, connected=True, mode="", clock=None):
+        """
+        Publish one poll result: a frame (`raw`), a failed poll (`error`),
+        or just the link state (both None). A stamped reply (acu_driver.Reply)
+        is timed by its round-trip midpoint; `clock` is ClockSync.estimate()
+        and, like the frame, is kept until replaced.
+        """
+        if raw is not None:
+            self._raw = raw.encode("ascii", errors="replace")[:RAW_SIZE]
+            midpoint = getattr(raw, "midpoint", None)
+            self._frame_time = midpoint if midpoint is not None else time.time()
+            self._rtt = getattr(raw, "rtt", None) or math.nan
+        if clock:
+            self._clock = clock
+        err = (error or "").encode("utf-8", errors="replace")[:ERR_SIZE]
+
+        seq = _SEQ.unpack_from(self.mm, 0)[0]
+        if seq & 1:
+            seq += 1  # a previous writer died mid-update
+        _SEQ.pack_into(self.mm, 0, seq + 1)
+
+        clock = self._clock
+        _HEAD.pack_into(self.mm, _HEAD_OFF,
+                        self._frame_time, time.time(), self._rtt,
+                        _nan(clock.get("offset")), _nan(clock.get("error")),
+                        _nan(clock.get("drift")),
+                        1 if connected else 0,
+                        1 if raw is not None else 0,
+                        mode.encode("ascii")[:8],
+                        len(self._raw), len(err))
+        self.mm[_RAW_OFF:_RAW_OFF + len(self._raw)] = self._raw
+        self.mm[_ERR_OFF:_ERR_OFF + len(err)] = err
+
+        _SEQ.pack_into(self.mm, 0, seq + 2)
+
+    def reset(self):
+        """Forget frames from a previous run."""
+        self._raw = b""
+        self._frame_time = 0.0
+        self._rtt = math.nan
+        self._clock = {}
+        self.publish(connected=False)
+
+    # ---------------- readers ----------------
+
+    def seq(self) -> int:
+        return _SEQ.unpack_from(self.mm, 0)[0]
+
+    def read(self):
+        """
+        Consistent copy of the block, or None if nothing was published yet.
+        """
+        for _ in range(100):
+            s1 = _SEQ.unpack_from(self.mm, 0)[0]
+            if s1 & 1:
+                continue
+            (frame_time, poll_time, rtt, offset, offset_err, drift,
+             connected, ok, mode, raw_len, err_len) = _HEAD.unpack_from(self.mm, _HEAD_OFF)
+            raw = self.mm[_RAW_OFF:_RAW_OFF + raw_len]
+            err = self.mm[_ERR_OFF:_ERR_OFF + err_len]
+            if _SEQ.unpack_from(self.mm, 0)[0] != s1:
+                continue
+            if s1 == 0:
+                return None
+            return {
+                "seq": s1,
+                "frame_time": frame_time,
+                "poll_time": poll_time,
+                "rtt": None if math.isnan(rtt) else rtt,
+                "clock": None if math.isnan(offset) else
+                         {"offset": offset, "error": offset_err, "drift": drift},
+                "connected": bool(connected),
+                "ok": bool(ok),
+                "mode": mode.rstrip(b"\0").decode("ascii", errors="replace"),
+                "raw": raw.decode("ascii", errors="replace"),
+                "error": err.decode("utf-8", errors="replace") or None,
+            }
+        return None
+
+    def close(self):
+        self.mm.close()
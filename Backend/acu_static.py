@@ -0,0 +1,108 @@
+"""
+Serve the dashboard (Frontend/) from the API process.
+
+At startup every asset is read once, given a content-hashed name
+(Style.3f2a9c1b0d.css) and compressed to gzip and, if the optional
+`brotli` package is installed, br. Hashed assets are served with
+`Cache-Control: immutable`, so browsers never refetch them; index.html
+is small, revalidated with an ETag, and points at the current hashes.
+"""
+import gzip
+import hashlib
+import os
+import re
+
+from fastapi.responses import Response
+
+try:
+    import brotli  # optional
+except ImportError:
+    brotli = None
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Frontend")
+
+TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".ico": "image/x-icon",
+}
+COMPRESSIBLE = (".html", ".css", ".js", ".svg")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+class _Asset:
+    def __init__(self, name, body: bytes, ctype):
+        self.name = name
+        self.ctype = ctype
+        self.etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        self.variants = {"identity": body}
+        if os.path.splitext(name)[1] in COMPRESSIBLE:
+            gz = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(gz) < len(body):
+                self.variants["gzip"] = gz
+            if brotli is not None:
+                br = brotli.compress(body, quality=11)
+                if len(br) < len(body):
+                    self.variants["br"] = br
+
+    def pick(self, accept_encoding: str):
+        accepted = {t.split(";")[0].strip().lower() for t in accept_encoding.split(",")}
+        for enc in ("br", "gzip"):
+            if enc in accepted and enc in self.variants:
+                return enc, self.variants[enc]
+        return "identity", self.variants["identity"]
+
+
+class StaticBundle:
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root or os.environ.get("ACU_FRONTEND_DIR", DEFAULT_ROOT))
+        self.assets = {}  # hashed name -> _Asset
+        self.index = None
+
+    def build(self):
+        assets, names = {}, {}
+        for fname in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, fname)
+            stem, ext = os.path.splitext(fname)
+            if fname == "index.html" or ext not in TYPES or not os.path.isfile(path):
+                continue
+            with open(path, "rb") as f:
+                body = f.read()
+            hashed = f"{stem}.{hashlib.sha256(body).hexdigest()[:10]}{ext}"
+            assets[hashed] = _Asset(hashed, body, TYPES[ext])
+            names[fname] = hashed
+
+        with open(os.path.join(self.root, "index.html"), "rb") as f:
+            html = f.read().decode("utf-8")
+
+        def relink(m):
+            target = names.get(m.group(2))
+            return f'{m.group(1)}="/assets/{target}"' if target else m.group(0)
+
+        html = re.sub(r'\b(href|src)="(?:\./)?([^"/?#]+)"', relink, html)
+
+        self.assets = assets
+        self.index = _Asset("index.html", html.encode("utf-8"), TYPES[".html"])
+        return self
+
+    def _respond(self, asset, accept_encoding, if_none_match, cache_control):
+        headers = {"ETag": asset.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if if_none_match and asset.etag in [t.strip() for t in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        enc, body = asset.pick(accept_encoding or "")
+        if enc != "identity":
+            headers["Content-Encoding"] = enc
+        return Response(body, media_type=asset.ctype, headers=headers)
+
+    def index_response(self, accept_encoding="", if_none_match=None):
+        return self._respond(self.index, accept_encoding, if_none_match, "no-cache")
+
+    def asset_response(self, name, accept_encoding="", if_none_match=None):
+        asset = self.assets.get(name)
+        if asset is None:
+            return None
+        return self._respond(asset, accept_encoding, if_none_match, IMMUTABLE)
@@ -0,0 +1,132 @@
+"""
+Rolling statistics over the $show stream.
+
+Each (field, window) keeps a time-ordered deque of samples plus:
+  - Welford running mean / variance, updated on insert and on expiry
+  - monotonic deques for min and max
+so every frame costs O(1) amortized regardless of the window length.
+"""
+import time
+from collections import deque
+
+WINDOWS = {"1s": 1.0, "1m": 60.0, "1h": 3600.0}
+
+
+def _num(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _angle_diff(a, b):
+    """a - b wrapped to [-180, 180)."""
+    return (a - b + 180.0) % 360.0 - 180.0
+
+
+class WindowStats:
+    def __init__(self, span: float):
+        self.span = span
+        self.samples = deque()  # (seq, t, x)
+        self.minq = deque()     # (seq, x), x increasing
+        self.maxq = deque()     # (seq, x), x decreasing
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._seq = 0
+
+    def add(self, t, x):
+        self._seq += 1
+        s = self._seq
+        self.samples.append((s, t, x))
+
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+
+        while self.minq and self.minq[-1][1] >= x:
+            self.minq.pop()
+        self.minq.append((s, x))
+        while self.maxq and self.maxq[-1][1] <= x:
+            self.maxq.pop()
+        self.maxq.append((s, x))
+
+        self.expire(t)
+
+    def expire(self, now):
+        cutoff = now - self.span
+        while self.samples and self.samples[0][1] <= cutoff:
+            s, _, x = self.samples.popleft()
+
+            self.n -= 1
+            if self.n == 0:
+                self.mean = self.m2 = 0.0
+            else:
+                d = x - self.mean
+                self.mean -= d / self.n
+                self.m2 = max(0.0, self.m2 - d * (x - self.mean))
+
+            if self.minq and self.minq[0][0] == s:
+                self.minq.popleft()
+            if self.maxq and self.maxq[0][0] == s:
+                self.maxq.popleft()
+
+    def summary(self):
+        if self.n == 0:
+            return {"count": 0, "min": None, "max": None, "mean": None, "stddev": None}
+        return {
+            "count": self.n,
+            "min": self.minq[0][1],
+            "max": self.maxq[0][1],
+            "mean": round(self.mean, 4),
+            "stddev": round((self.m2 / self.n) ** 0.5, 4),
+        }
+
+
+class ShowAggregator:
+    """AGC level and pointing error (preset - current) over 1 s / 1 min / 1 h."""
+
+    FIELDS = ("agc_level", "az_error", "pitch_error", "pol_error")
+
+    def __init__(self, windows=WINDOWS):
+        self.windows = dict(windows)
+        self.stats = {f: {w: WindowStats(span) for w, span in self.windows.items()}
+                      for f in self.FIELDS}
+        self.last_time = None
+
+    @staticmethod
+    def values(parsed: dict) -> dict:
+        out = {"agc_level": _num(parsed.get("agc_level"))}
+        for axis, key in (("az", "azimuth"), ("pitch", "pitch"), ("pol", "polarization")):
+            preset = _num(parsed.get(f"preset_{key}"))
+            current = _num(parsed.get(f"current_{key}"))
+            if preset is None or current is None:
+                out[f"{axis}_error"] = None
+            elif axis == "pitch":
+                out[f"{axis}_error"] = preset - current
+            else:
+                out[f"{axis}_error"] = _angle_diff(preset, current)
+        return out
+
+    def on_frame(self, parsed: dict, frame_time=None):
+        t = frame_time or time.time()
+        if t == self.last_time:
+            return  # the same frame published again: count it once
+        for field, x in self.values(parsed).items():
+            if x is None:
+                continue
+            for ws in self.stats[field].values():
+                ws.add(t, x)
+        self.last_time = t
+
+    def snapshot(self):
+        now = time.time()
+        out = {}
+        for w in self.windows:
+            out[w] = {}
+            for field in self.FIELDS:
+                ws = self.stats[field][w]
+                ws.expire(now)
+                out[w][field] = ws.summary()
+        return {"time": now, "last_frame": self.last_time, "windows": out}
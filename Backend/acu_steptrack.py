@@ -0,0 +1,215 @@
+"""
+Server-side AGC peak search (step-track).
+
+Hill climbing around the current pointing: probe +/- step on azimuth,
+then on pitch, with `dirx`; keep any probe that raises `agc_level`,
+halve the step when no probe helps, stop once the step is below
+`min_step`. The loop runs server-side, with no client in it.
+
+Every position / AGC reading must come from a new exchange: a shared or
+cached `get show` reply (the drivers coalesce identical queries) would
+make N averaged samples one value N times. `read_show(after)` supplies
+a $show line requested after wall time `after`; the default sends
+`get show` itself, `poll` seconds apart.
+
+Stop and `max_time` are checked before every exchange and wait, so a run
+ends within one exchange of either. On timeout the best point found is
+commanded, but not waited for.
+"""
+import threading
+import time
+
+from acu_driver import parse_show
+
+
+def _num(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+class StepTrackError(Exception):
+    pass
+
+
+class _Abort(Exception):
+    """Ends a run from inside a move or a measurement."""
+
+    def __init__(self, outcome):
+        super().__init__(outcome)
+        self.outcome = outcome
+
+
+class StepTrack:
+    def __init__(self, send, step=0.2, min_step=0.02, max_offset=2.0, speed=2.0,
+                 dwell=0.1, settle_timeout=3.0, tolerance=0.05, samples=1,
+                 min_gain=0.05, max_time=60.0, sport_type="l", read_show=None, poll=0.2):
+        self.send = send                # blocking: send(frame_code, data) -> (frame, resp)
+        self.read_show = read_show or self._send_show
+        self.poll = poll                # pause between position checks, s (~ a poll period)
+        self.step = step                # initial probe size, deg
+        self.min_step = min_step        # converged once step < min_step
+        self.max_offset = max_offset    # never leave origin by more than this, deg
+        self.speed = speed              # dirx speed, deg/s
+        self.dwell = dwell              # extra wait after reaching a probe point, s
+        self.settle_timeout = settle_timeout
+        self.tolerance = tolerance      # "position reached" band, deg
+        self.samples = samples          # AGC readings averaged per probe
+        self.min_gain = min_gain        # AGC rise that counts as better
+        self.max_time = max_time
+        self.sport_type = sport_type    # dirx l = all axes
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_show = 0.0
+        self._deadline = float("inf")   # monotonic end of the run (max_time)
+        self.status = {"state": "idle"}
+
+    # ---------------- control ----------------
+
+    def start(self):
+        if self.running():
+            raise StepTrackError("Step-track already running")
+        self._stop.clear()
+        self.status = {"state": "starting"}
+        self._thread = threading.Thread(target=self._run, name="steptrack", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.settle_timeout + 2.0)
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # ---------------- link helpers ----------------
+
+    def _send_show(self, after):
+        # `poll` apart, past any coalescing window: every call is a new exchange
+        time.sleep(max(0.0, self._last_show + self.poll - time.monotonic()))
+        resp = self.send("get show", [])[1]
+        self._last_show = time.monotonic()
+        return resp
+
+    def _show(self):
+        resp = self.read_show(time.time())
+        p = parse_show(resp)
+        az, pitch, agc = (_num(p.get("current_azimuth")), _num(p.get("current_pitch")),
+                          _num(p.get("agc_level")))
+        if az is None or pitch is None or agc is None:
+            raise StepTrackError(f"Unusable $show frame: {resp}")
+        return az, pitch, agc
+
+    def _check(self):
+        """Raise _Abort once stopped or past max_time; checked between link steps."""
+        if self._stop.is_set():
+            raise _Abort("stopped")
+        if time.monotonic() >= self._deadline:
+            raise _Abort("timeout")
+
+    def _pause(self, seconds):
+        self._stop.wait(max(0.0, min(seconds, self._deadline - time.monotonic())))
+        self._check()
+
+    def _command(self, az, pitch):
+        data = [self.sport_type, f"{az % 360.0:.2f}", f"{self.speed:.2f}",
+                f"{pitch:.2f}", f"{self.speed:.2f}"]
+        self.send("dirx", data)
+        self.status["moves"] += 1
+
+    def _move(self, az, pitch):
+        self._check()
+        self._command(az, pitch)
+
+        # wait until the antenna reports the target, then dwell
+        deadline = time.monotonic() + self.settle_timeout
+        while time.monotonic() < deadline:
+            self._check()
+            cur_az, cur_pitch, _ = self._show()
+            d_az = abs((cur_az - az + 180.0) % 360.0 - 180.0)
+            if d_az <= self.tolerance and abs(cur_pitch - pitch) <= self.tolerance:
+                break
+            self._pause(self.poll)
+        if self.dwell:
+            self._pause(self.dwell)
+
+    def _measure(self):
+        total = 0.0
+        for _ in range(self.samples):
+            self._check()
+            total += self._show()[2]
+        return total / self.samples
+
+    # ---------------- loop ----------------
+
+    def _run(self):
+        t0 = time.monotonic()
+        self._deadline = t0 + self.max_time
+        st = self.status = {"state": "running", "moves": 0, "iterations": 0}
+        outcome = "converged"
+        center = None
+        try:
+            az0, pitch0, agc0 = self._show()
+            center = {"az": az0, "pitch": pitch0}
+            best = self._measure()
+            st.update({"origin": {"az": az0, "pitch": pitch0},
+                       "start_agc": agc0, "best_agc": best})
+
+            step = self.step
+            while step >= self.min_step:
+                self._check()
+                st["iterations"] += 1
+                st["step"] = step
+                improved = False
+
+                for axis in ("az", "pitch"):
+                    for sign in (1, -1):
+                        cand = dict(center)
+                        cand[axis] += sign * step
+                        origin = az0 if axis == "az" else pitch0
+                        if abs(cand[axis] - origin) > self.max_offset:
+                            continue
+
+                        self._move(cand["az"], cand["pitch"])
+                        agc = self._measure()
+                        if agc > best + self.min_gain:
+                            center, best, improved = cand, agc, True
+                            break  # keep this axis, go on with the next one
+
+                if not improved:
+                    step /= 2.0
+
+                st.update({"best_agc": best,
+                           "offset": {"az": round(center["az"] - az0, 4),
+                                      "pitch": round(center["pitch"] - pitch0, 4)}})
+
+            # park on the best point found
+            self._move(center["az"], center["pitch"])
+            st["center"] = center
+
+        except _Abort as e:
+            outcome = e.outcome
+            st["center"] = center
+            if outcome == "timeout" and center is not None:
+                # head for the best point, but do not wait for it past max_time
+                try:
+                    self._command(center["az"], center["pitch"])
+                except Exception as err:
+                    st["error"] = str(err)
+
+        except Exception as e:
+            outcome = "failed"
+            st["error"] = str(e)
+
+        if outcome == "stopped":
+            try:
+                self.send("stop", [])
+            except Exception:
+                pass
+
+        st["elapsed"] = round(time.monotonic() - t0, 3)
+        if outcome == "converged":
+            st["convergence_time"] = st["elapsed"]
+        st["state"] = outcome  # last: pollers see a complete result
@@ -1,27 +1,99 @@
+import logging
 import socket
 import threading
 import time
+from collections import deque
+
+import acu_metrics as metrics
+import acu_trace
+from acu_driver import Reply, frame_code_of, is_query, verify_checksum
+from acu_singleflight import SingleFlight
+
+log = logging.getLogger("acu.link")
+
+
+def expected_reply(code: str) -> str:
+    """
+    What a reply to `code` is keyed by (see reply_key):
+      "get show" -> "show", "get sat" -> "sat", "dirx" -> "dirx"
+    """
+    code = code.strip().lower()
+    return code[4:].strip() if code.startswith("get ") else code
+
+
+def reply_key(line: str) -> str:
+    """
+    "$show,..." -> "show", "$cmd,sat,..." -> "sat"
+    """
+    parts = line.strip().lstrip("$").split(",", 2)
+    if parts[0].strip().lower() == "cmd" and len(parts) > 1:
+        return parts[1].strip().lower()
+    return parts[0].strip().lower()
+
+
+class _Pending:
+    """One request in flight on a pipelined link."""
+
+    __slots__ = ("expect", "done", "line", "received", "error", "sent", "held", "wrote")
+
+    def __init__(self, expect):
+        self.expect = expect
+        self.done = threading.Event()
+        self.line = self.received = self.error = None
+        self.sent = self.held = self.wrote = None
+
+    def finish(self, line=None, received=None, error=None):
+        self.line, self.received, self.error = line, received, error
+        self.done.set()
+
 
 class ACUTcp:
+    """
+    Stop-and-wait by default: one frame on the wire, wait for its reply.
+
+    With `window` > 1 (pipelined), up to `window` requests are in flight
+    at once and a reader thread hands each reply line to the oldest
+    request expecting that frame code. A reply that skips requests (or
+    matches none) means the ACU answered out of order or dropped one:
+    the skipped requests are retried and the link drops back to one in
+    flight for `fallback_hold` seconds.
+    """
     mode = "tcp"
 
-    def __init__(self):
+    def __init__(self, coalesce_window=0.0, window=1, fallback_hold=30.0):
         self.sock = None
         self.lock = threading.Lock()
+        self.flights = SingleFlight(coalesce_window)
         self.host = None
         self.port = None
 
-    def connect(self, host: str, port: int, timeout=5.0):
+        self.window = window                # max requests in flight; 1 = stop-and-wait
+        self.fallback_hold = fallback_hold  # s at one in flight after an ordering violation
+        self._cond = threading.Condition()
+        self._pending = deque()             # _Pending, in send order
+        self._limit = window
+        self._strict_until = 0.0
+
+    def connect(self, host: str, port: int, timeout=5.0, window=None):
+        if self.sock is not None:
+            self.disconnect()
+        if window is not None:
+            self.window = self._limit = max(1, int(window))
         self.host = host
         self.port = port
 
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # frames are tiny: without this, Nagle holds back the next pipelined
+        # frame until the previous one is ACKed (up to a delayed-ACK period)
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         s.settimeout(timeout)
         s.connect((host, port))
 
         self.sock = s
+        if self.window > 1:
+            threading.Thread(target=self._read_loop, args=(s,), name="tcp-reader", daemon=True).start()
 
     def reconnect(self, timeout=5.0):
         if self.host and self.port:
@@ -31,26 +103,56 @@ class ACUTcp:
 
     def disconnect(self):
         if self.sock:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)  # also wakes a pipelined reader
+            except OSError:
+                pass
             try:
                 self.sock.close()
             except Exception:
                 pass
         self.sock = None
+        self._fail_pending(ConnectionError("TCP disconnected"))
+        self.flights.forget()
 
     def is_connected(self):
         return self.sock is not None
 
-    def send_and_read(self, frame, retries=3, timeout=5.0):
+    def send_and_read(self, frame, retries=3, timeout=5.0, fresh=False):
         if not self.is_connected():
             raise RuntimeError("TCP not connected")
 
+        exchange = self._pipelined if self.window > 1 else self._exchange
+        if is_query(frame):
+            return self.flights.do(frame, lambda: exchange(frame, retries, timeout), fresh)
+        try:
+            return exchange(frame, retries, timeout)
+        finally:
+            self.flights.forget()  # state may have changed: no pre-command replies
+
+    def _exchange(self, frame, retries, timeout):
         raw = frame if isinstance(frame, (bytes, bytearray)) else frame.encode("ascii")
+        code = frame_code_of(raw)
+        tr = acu_trace.current()
 
         for attempt in range(retries):
+            if attempt:
+                metrics.RETRIES.labels(self.mode, code).inc()
+            waited = time.perf_counter()
             with self.lock:
+                held = time.perf_counter()
+                metrics.LOCK_WAIT_SECONDS.labels(self.mode, code).observe(held - waited)
+                if tr:
+                    tr.add("lock_wait", waited, held, attempt=attempt)
+                wrote = held
                 try:
                     self.sock.settimeout(timeout)
+                    sent = time.monotonic(), time.time()
                     self.sock.sendall(raw)
+                    metrics.BYTES_SENT.labels(self.mode).inc(len(raw))
+                    wrote = time.perf_counter()
+                    if tr:
+                        tr.add("write", held, wrote, attempt=attempt)
 
                     buff = b""
                     start = time.time()
@@ -64,22 +166,234 @@ class ACUTcp:
                         # CRLF preferred
                         if b"\r\n" in buff:
                             line, _ = buff.split(b"\r\n", 1)
-                            return line.decode("ascii", errors="replace").strip()
+                            return self._reply(code, raw, sent, held, wrote, line, tr)
 
                         # fallback LF
                         if b"\n" in buff:
                             line = buff.split(b"\n")[0]
-                            return line.decode("ascii", errors="replace").strip()
+                            return self._reply(code, raw, sent, held, wrote, line, tr)
 
                 except socket.timeout:
-                    pass
-                except Exception:
+                    if tr:
+                        tr.add("read", wrote, attempt=attempt, timeout=True)
+                except Exception as e:
                     # try reconnect once
+                    log.warning("TCP error on %s (%s), reconnecting", code, e, extra={"code": code})
+                    reconnecting = time.perf_counter()
                     try:
                         self.reconnect(timeout=timeout)
                     except Exception:
                         pass
+                    if tr:
+                        tr.add("reconnect", reconnecting, attempt=attempt)
+                finally:
+                    metrics.observe_busy(self.mode, time.perf_counter() - held)
 
+            slept = time.perf_counter()
             time.sleep(0.2)
+            if tr:
+                tr.add("retry_sleep", slept, attempt=attempt)
 
+        metrics.TIMEOUTS.labels(self.mode, code).inc()
+        log.warning("TX %s: no reply after %d tries", raw.decode("ascii", "replace").strip(), retries,
+                    extra={"code": code})
         raise TimeoutError("No TCP response after retries")
+
+    def _reply(self, code, raw, sent, held, wrote, line: bytes, tr, received=()):
+        resp = Reply.stamped(line.decode("ascii", errors="replace").strip(), *sent, *received)
+        checksum_ok = verify_checksum(resp)
+        metrics.observe_reply(self.mode, code, held, len(line) + 2, checksum_ok)
+        log.log(logging.DEBUG if checksum_ok else logging.WARNING, "TX %s RX %s%s",
+                raw.decode("ascii", "replace").strip(), resp, "" if checksum_ok else " [bad checksum]",
+                extra={"code": code})
+        if tr:
+            tr.add("read", wrote)
+        return resp
+
+    # =========================================================
+    # Pipelined mode (window > 1)
+    # =========================================================
+    def send_many(self, frames, retries=3, timeout=5.0):
+        """
+        Send `frames` in this order, keeping up to `window` in flight.
+        Returns one reply or exception per frame, in order. Frames whose
+        reply did not come back are then retried one by one, in order.
+        """
+        if self.window <= 1:
+            return [self._attempt(self.send_and_read, f, retries, timeout) for f in frames]
+        if not self.is_connected():
+            raise RuntimeError("TCP not connected")
+
+        tr = acu_trace.current()
+        pending = []
+        for frame in frames:
+            raw = frame if isinstance(frame, (bytes, bytearray)) else frame.encode("ascii")
+            code = frame_code_of(raw)
+            try:
+                pending.append((frame, raw, code, self._submit(raw, code, timeout, tr)))
+            except Exception:
+                pending.append((frame, raw, code, None))
+
+        results = []
+        for frame, raw, code, p in pending:
+            resp = p and self._collect(p, raw, code, timeout, tr)
+            if resp is None:
+                resp = self._attempt(self.send_and_read, frame, max(1, retries - 1), timeout)
+            results.append(resp)
+        self.flights.forget()
+        return results
+
+    @staticmethod
+    def _attempt(fn, *args):
+        try:
+            return fn(*args)
+        except Exception as e:
+            return e
+
+    def _pipelined(self, frame, retries, timeout):
+        raw = frame if isinstance(frame, (bytes, bytearray)) else frame.encode("ascii")
+        code = frame_code_of(raw)
+        tr = acu_trace.current()
+
+        for attempt in range(retries):
+            if attempt:
+                metrics.RETRIES.labels(self.mode, code).inc()
+            sock = self.sock
+            try:
+                p = self._submit(raw, code, timeout, tr, attempt)
+                resp = self._collect(p, raw, code, timeout, tr, attempt)
+                if resp is not None:
+                    return resp
+                if isinstance(p.error, ConnectionError):
+                    raise p.error
+            except socket.timeout:
+                if tr:
+                    tr.add("lock_wait", time.perf_counter(), attempt=attempt, timeout=True)
+            except Exception as e:
+                log.warning("TCP error on %s (%s), reconnecting", code, e, extra={"code": code})
+                reconnecting = time.perf_counter()
+                with self.lock:
+                    if self.sock is sock:  # not already done by another caller
+                        try:
+                            self.reconnect(timeout=timeout)
+                        except Exception:
+                            pass
+                if tr:
+                    tr.add("reconnect", reconnecting, attempt=attempt)
+
+            slept = time.perf_counter()
+            time.sleep(0.2)
+            if tr:
+                tr.add("retry_sleep", slept, attempt=attempt)
+
+        metrics.TIMEOUTS.labels(self.mode, code).inc()
+        log.warning("TX %s: no reply after %d tries", raw.decode("ascii", "replace").strip(), retries,
+                    extra={"code": code})
+        raise TimeoutError("No TCP response after retries")
+
+    def _submit(self, raw, code, timeout, tr, attempt=0):
+        """Wait for a free slot, then write; the reply is matched by the reader."""
+        p = _Pending(expected_reply(code))
+        waited = time.perf_counter()
+        with self._cond:
+            if not self._cond.wait_for(lambda: len(self._pending) < self._slots(), timeout):
+                raise socket.timeout("no free pipeline slot")
+            p.held = time.perf_counter()
+            metrics.LOCK_WAIT_SECONDS.labels(self.mode, code).observe(p.held - waited)
+            if tr:
+                tr.add("lock_wait", waited, p.held, attempt=attempt)
+            sock = self.sock
+            if sock is None:
+                raise ConnectionError("TCP not connected")
+            # appended and written under one lock: the queue is the wire order
+            p.sent = time.monotonic(), time.time()
+            self._pending.append(p)
+            try:
+                sock.sendall(raw)
+            except Exception:
+                self._pending.remove(p)
+                self._cond.notify_all()
+                raise
+        p.wrote = time.perf_counter()
+        metrics.BYTES_SENT.labels(self.mode).inc(len(raw))
+        # the link is shared while pipelined: only the write counts as busy
+        metrics.observe_busy(self.mode, p.wrote - p.held)
+        if tr:
+            tr.add("write", p.held, p.wrote, attempt=attempt)
+        return p
+
+    def _collect(self, p, raw, code, timeout, tr, attempt=0):
+        """The reply for `p`, or None (timed out / skipped / connection lost)."""
+        if not p.done.wait(timeout):
+            with self._cond:
+                if p in self._pending:
+                    self._pending.remove(p)
+                    self._cond.notify_all()
+        if p.line is not None:
+            return self._reply(code, raw, p.sent, p.held, p.wrote, p.line, tr, p.received)
+        if tr:
+            tr.add("read", p.wrote, attempt=attempt, timeout=p.error is None,
+                   error=type(p.error).__name__ if p.error else None)
+        return None
+
+    def _slots(self):
+        """Requests allowed in flight now (caller holds _cond)."""
+        if self._limit < self.window and time.monotonic() >= self._strict_until:
+            self._limit = self.window
+            log.info("TCP pipelining back on (%d in flight)", self.window)
+        return self._limit
+
+    def _read_loop(self, sock):
+        buff = b""
+        while self.sock is sock:
+            try:
+                chunk = sock.recv(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not chunk:
+                break  # closed by the peer
+            received = time.monotonic(), time.time()
+            buff += chunk
+            while b"\n" in buff:
+                line, buff = buff.split(b"\n", 1)
+                line = line.rstrip(b"\r")
+                if line.strip():
+                    self._match(line, received)
+        if self.sock is sock:
+            self._fail_pending(ConnectionError("TCP connection closed"))
+
+    def _match(self, line: bytes, received):
+        text = line.decode("ascii", errors="replace")
+        key = reply_key(text)
+        with self._cond:
+            for skip, p in enumerate(self._pending):
+                if p.expect == key:
+                    break
+            else:
+                if self._pending:
+                    self._violated(f"reply {text.strip()!r} matches no request in flight")
+                else:
+                    log.warning("RX %s: unsolicited, dropped", text.strip())
+                return
+
+            for _ in range(skip):
+                self._pending.popleft().finish(error=RuntimeError("reply skipped"))
+            if skip:
+                self._violated(f"{skip} request(s) skipped by {key!r} reply")
+            self._pending.popleft().finish(line=line, received=received)
+            self._cond.notify_all()
+
+    def _violated(self, reason):
+        """Ordering broken: one request in flight for `fallback_hold` s (caller holds _cond)."""
+        metrics.PIPELINE_FALLBACKS.labels(self.mode).inc()
+        log.warning("TCP pipelining off for %g s: %s", self.fallback_hold, reason)
+        self._limit = 1
+        self._strict_until = time.monotonic() + self.fallback_hold
+
+    def _fail_pending(self, error):
+        with self._cond:
+            while self._pending:
+                self._pending.popleft().finish(error=error)
+            self._cond.notify_all()
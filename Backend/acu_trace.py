@@ -0,0 +1,104 @@
+"""
+Per-request span tracing of the driver hot path.
+
+A trace is started per HTTP request (when enabled) and carried in a
+ContextVar, which Starlette's threadpool and asyncio.to_thread copy into
+the worker thread. send_frame and the drivers add spans to whatever trace
+is current. When tracing is off, every hook is a ContextVar lookup that
+returns None.
+
+Finished traces are kept in a ring buffer for /api/debug/traces.
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+
+_current = contextvars.ContextVar("acu_trace", default=None)
+
+enabled = False
+_ring = deque(maxlen=200)
+_ring_lock = threading.Lock()
+
+
+class Trace:
+    def __init__(self, request_id: str, name: str):
+        self.request_id = request_id
+        self.name = name
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        self.end = None
+        self.status = None
+        self.spans = []  # (name, t0, t1, attrs)
+
+    def add(self, name, t0, t1=None, **attrs):
+        """Record a span from perf_counter() values."""
+        self.spans.append((name, t0, time.perf_counter() if t1 is None else t1, attrs))
+
+    def to_dict(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        phases = {}
+        spans = []
+        for name, t0, t1, attrs in self.spans:
+            ms = (t1 - t0) * 1000
+            phases[name] = round(phases.get(name, 0.0) + ms, 3)
+            spans.append({"name": name,
+                          "start_ms": round((t0 - self.start) * 1000, 3),
+                          "ms": round(ms, 3), **attrs})
+        return {
+            "request_id": self.request_id,
+            "name": self.name,
+            "started": self.wall,
+            "status": self.status,
+            "total_ms": round((end - self.start) * 1000, 3),
+            "phases": phases,
+            "spans": spans,
+        }
+
+
+def current():
+    return _current.get()
+
+
+def begin(request_id: str, name: str):
+    """Start a trace for this request; returns a token for finish(), or None if off."""
+    if not enabled:
+        return None
+    return _current.set(Trace(request_id, name))
+
+
+def finish(token, status=None):
+    if token is None:
+        return
+    tr = _current.get()
+    _current.reset(token)
+    if tr is None:
+        return
+    tr.end = time.perf_counter()
+    tr.status = status
+    with _ring_lock:
+        _ring.append(tr)
+
+
+def configure(on=None, capacity=None):
+    global enabled, _ring
+    if on is not None:
+        enabled = bool(on)
+    if capacity is not None and capacity != _ring.maxlen:
+        with _ring_lock:
+            _ring = deque(_ring, maxlen=max(1, capacity))
+
+
+def recent(limit=50):
+    with _ring_lock:
+        items = list(_ring)[-limit:]
+    return [t.to_dict() for t in reversed(items)]
+
+
+def clear():
+    with _ring_lock:
+        _ring.clear()
+
+
+def settings():
+    return {"enabled": enabled, "capacity": _ring.maxlen, "stored": len(_ring)}
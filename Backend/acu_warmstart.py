@@ -0,0 +1,97 @@
+"""
+Warm-start snapshot: last known $show, satellite, place and LO replies
+kept in a small JSON file, so a restarted backend (or a freshly opened
+dashboard) has something to show before the first live round trips.
+
+Updates only touch memory; a background thread writes the file at most
+once per `debounce` seconds, atomically (temp file + rename).
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger("acu.warmstart")
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "acu_warmstart.json")
+
+
+class WarmStart:
+    def __init__(self, path=None, debounce=2.0):
+        self.path = path or os.environ.get("ACU_WARMSTART_PATH", DEFAULT_PATH)
+        self.debounce = debounce
+        self.data = {}
+        self._lock = threading.Lock()
+        self._changed = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                with self._lock:
+                    self.data = data
+        except (OSError, ValueError):
+            pass
+        return self
+
+    def update(self, key, value: dict):
+        with self._lock:
+            self.data[key] = {**value, "saved_at": time.time()}
+            self._changed = True
+        self._wake.set()
+
+    def get(self, key):
+        """Cached entry marked stale, or None."""
+        with self._lock:
+            entry = self.data.get(key)
+        if entry is None:
+            return None
+        return {**entry, "stale": True}
+
+    def all(self):
+        with self._lock:
+            keys = list(self.data)
+        return {k: self.get(k) for k in keys}
+
+    # ---------------- writer ----------------
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="warmstart", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            if self._stop.wait(self.debounce):
+                break
+            self.flush()
+
+    def flush(self):
+        self._wake.clear()
+        with self._lock:
+            if not self._changed:
+                return
+            self._changed = False
+            text = json.dumps(self.data)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning("Warm-start snapshot not saved: %s", e)
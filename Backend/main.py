@@ -1,14 +1,62 @@
 import asyncio
-import traceback
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from pydantic import BaseModel
 from typing import List, Optional
 
-from acu_driver import acu_serial, build_frame, parse_show
+import acu_logstore
+import acu_metrics as metrics
+import acu_trace
+from acu_clock import parse_acu_time
+from acu_discover import DISCOVERY_BAUDRATES, discover
+from acu_driver import acu_serial, build_frame, parse_sat, parse_show
+from acu_events import EventEngine
+from acu_gateway import GatewayClient
+from acu_history import HistoryStore
+from acu_jog import JogScheduler
+from acu_motion import MotionCompensator
+from acu_outbox import LatestOutbox
+from acu_poller import SHOW_FRAME, PollRate, ShowPoller
+from acu_profiles import ProfileStore, apply_profile
+from acu_state import ShowState
+from acu_static import StaticBundle
+from acu_stats import ShowAggregator
+from acu_steptrack import StepTrack, StepTrackError
 from acu_tcp import ACUTcp
+from acu_warmstart import WarmStart
 
-app = FastAPI(title="ACU Web Controller")
+log = logging.getLogger("acu.api")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    log_listener = acu_logstore.install(log_store)
+    # behind a gateway, the gateway process runs the poller
+    try:
+        frontend.build()
+    except OSError as e:
+        log.warning("Frontend not served: %s", e)
+    warm_start.load().start()
+    if not gateway:
+        history.start()
+        show_poller.start()
+    feed = asyncio.create_task(show_feed())
+    yield
+    feed.cancel()
+    show_poller.stop()
+    history.stop()
+    warm_start.stop()
+    log_listener.stop()
+
+
+app = FastAPI(title="ACU Web Controller", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,9 +66,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def request_id_trace(request: Request, call_next):
+    """
+    Every response carries X-Request-ID (taken from the request or made up);
+    with tracing on, /api requests also record a span timeline under that id.
+    """
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex[:12]
+    path = request.url.path
+    token = None
+    if path.startswith("/api/") and not path.startswith("/api/debug/"):
+        token = acu_trace.begin(request_id, f"{request.method} {path}")
+
+    status = None
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        acu_trace.finish(token, status)
+
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 tcp_acu = ACUTcp()
 acu = acu_serial  # active driver pointer
 
+# With ACU_GATEWAY_SOCKET set, the link is owned by acu_gateway.py and this
+# process (one of possibly many uvicorn workers) only forwards to it.
+GATEWAY_SOCKET = os.environ.get("ACU_GATEWAY_SOCKET")
+gateway = GatewayClient(GATEWAY_SOCKET) if GATEWAY_SOCKET else None
+if gateway:
+    acu = gateway
+
+# Latest $show frame, shared by every worker through a memory-mapped file
+show_state = ShowState()
+# Telemetry history in SQLite; written by whoever runs the poller (see /api/history)
+history = HistoryStore()
+show_poller = ShowPoller(lambda: acu, show_state, interval=0.2, rate=PollRate(),
+                         consumers=[history.on_frame])
+
+# Consumers of new frames inside this worker
+event_engine = EventEngine()
+frontend = StaticBundle()
+steptrack = None  # last StepTrack run (at most one at a time)
+show_stats = ShowAggregator()
+motion = MotionCompensator(
+    # a late correction is worthless: one try, the next frame brings a newer one
+    lambda frame_code, data: send_frame("cmd", frame_code, data, retries=1, timeout=0.5))
+frame_consumers = [event_engine.on_frame, show_stats.on_frame, motion.on_frame]
+
+# Driver frames, endpoint messages and events: ring + SQLite, see /api/logs
+log_store = acu_logstore.LogStore()
+
+# Named sat / place / LO configurations, on disk
+profiles = ProfileStore()
+
+# Last known replies, on disk, so new clients never start from a blank page
+warm_start = WarmStart()
+WARM_KEYS = {"get sat": "sat", "get place": "place", "get beacon": "beacon", "get dvb": "dvb"}
+
 
 # =========================================================
 # Models
@@ -29,12 +135,62 @@ class ConnectSerialReq(BaseModel):
     port: str
     baudrate: int = 38400
     timeout: float = 0.5
+    coalesce_window: float = 0.1  # reuse identical "get ..." replies this fresh
 
 
 class ConnectTcpReq(BaseModel):
     host: str
     port: int
     timeout: float = 2.0
+    coalesce_window: float = 0.1
+    window: int = 1  # requests in flight at once; >1 pipelines (high-RTT links)
+
+
+class DiscoverReq(BaseModel):
+    ports: Optional[List[str]] = None  # default: every port from /api/ports
+    baudrates: List[int] = list(DISCOVERY_BAUDRATES)
+    timeout: float = 0.15              # per probe, on top of the wire time at each rate
+    auto_connect: bool = False         # connect to the first ACU found
+
+
+class StepTrackReq(BaseModel):
+    step: float = 0.2            # initial probe size, deg
+    min_step: float = 0.02       # converged below this, deg
+    max_offset: float = 2.0      # max distance from the start point, deg
+    speed: float = 2.0           # dirx speed, deg/s
+    dwell: float = 0.1           # extra settle after reaching a probe point, s
+    samples: int = 1             # AGC readings averaged per probe
+    min_gain: float = 0.05       # AGC rise that counts as an improvement
+    max_time: float = 60.0
+    sport_type: str = "l"
+
+
+class MotionReq(BaseModel):
+    enabled: bool
+    sat_longitude: Optional[float] = None  # default: from "get sat"
+    target_az: Optional[float] = None      # or a fixed earth-frame target
+    target_el: Optional[float] = None
+    latency: Optional[float] = None        # command latency, s; default: measured
+    speed: Optional[float] = None          # dirx speed, deg/s
+    min_step: Optional[float] = None       # smallest correction sent, deg
+
+
+class TracingReq(BaseModel):
+    enabled: Optional[bool] = None
+    capacity: Optional[int] = None  # traces kept in the ring buffer
+    clear: bool = False
+
+
+class EventRule(BaseModel):
+    id: str
+    kind: str  # change | above | below | equals | not_equals | stale | link_down
+    field: Optional[str] = None
+    value: Optional[str] = None
+    threshold: Optional[float] = None
+    hysteresis: float = 0.0
+    seconds: Optional[float] = None
+    severity: str = "info"
+    enabled: bool = True
 
 
 class SendReq(BaseModel):
@@ -84,6 +240,19 @@ class LOSetReq(BaseModel):
     mode: str = "beacon"  # "beacon" or "dvb"
 
 
+# ---- Profile: everything needed for a satellite handover ----
+class ProfileLO(BaseModel):
+    lo_mhz: float
+    gain: float
+
+
+class ProfileReq(BaseModel):
+    sat: Optional[SatSetReq] = None
+    place: Optional[PlaceSetReq] = None
+    beacon: Optional[ProfileLO] = None
+    dvb: Optional[ProfileLO] = None
+
+
 # ---- Unified antenna action (optional) ----
 class AntennaActionReq(BaseModel):
     action: str  # "reset" | "align_star" | "collection" | "stop"
@@ -94,31 +263,301 @@ class AntennaActionReq(BaseModel):
 # =========================================================
 def send_frame(frame_type: str, frame_code: str, data: List[str], retries=3, timeout=0.7):
     frame = build_frame(frame_type, frame_code, *data)
-    resp = acu.send_and_read(frame, retries=retries, timeout=timeout)
+    start = time.perf_counter()
+    tr = acu_trace.current()
+    if tr:
+        # request accepted -> here: routing, validation and threadpool queueing
+        tr.add("dispatch", tr.start, start)
+    try:
+        resp = acu.send_and_read(frame, retries=retries, timeout=timeout)
+    except Exception as e:
+        metrics.SEND_FRAME_ERRORS.labels(frame_code, type(e).__name__).inc()
+        if tr:
+            tr.add("send_frame", start, code=frame_code, error=type(e).__name__)
+        raise
+    metrics.SEND_FRAME_SECONDS.labels(frame_code).observe(time.perf_counter() - start)
+    if tr:
+        tr.add("send_frame", start, code=frame_code)
+    if frame_code in WARM_KEYS:
+        warm_start.update(WARM_KEYS[frame_code], {"frame": frame.strip(), "raw": resp})
     return frame.strip(), resp
 
 
+# the gateway's poller republishes at least once per attempt; allow for a
+# get show that is still working through its retries
+LINK_STATE_MAX_AGE = 20.0
+
+
+def link_state() -> dict:
+    """
+    {"connected", "mode"} without a round trip. Behind a gateway (where
+    asking would be a blocking socket call, and fail if it is down) this
+    is what its poller last published; a stale block means no gateway.
+    """
+    if not gateway:
+        return {"connected": acu.is_connected(), "mode": acu.mode}
+    snap = show_state.read()
+    if snap is None or time.time() - snap["poll_time"] > LINK_STATE_MAX_AGE:
+        return {"connected": False, "mode": "-"}
+    return {"connected": snap["connected"], "mode": snap["mode"]}
+
+
+# =========================================================
+# Helper: new-frame feed for this worker
+# =========================================================
+async def show_feed():
+    """
+    Watch the shared state block and hand every new $show frame to the
+    in-process consumers (events, stats, ...). Costs one seqlock read per tick.
+    """
+    last_seq = 0
+    while True:
+        snap = show_state.read()
+        if snap and snap["seq"] != last_seq:
+            last_seq = snap["seq"]
+            event_engine.on_tick(connected=snap["connected"])
+            if snap["connected"] and snap["ok"]:
+                parsed = parse_show(snap["raw"])
+                for consumer in frame_consumers:
+                    try:
+                        consumer(parsed, snap["frame_time"])
+                    except Exception as e:
+                        log.exception("show_feed consumer failed: %s", e)
+                warm_start.update("show", {"mode": snap["mode"], "raw": snap["raw"],
+                                           "frame_time": snap["frame_time"]})
+        else:
+            event_engine.on_tick(connected=bool(snap and snap["connected"]))
+        await asyncio.sleep(0.02)
+
+
+# =========================================================
+# Helper: WebSocket bookkeeping
+# =========================================================
+async def ws_accept(websocket: WebSocket):
+    await websocket.accept()
+    metrics.WS_CLIENTS.labels(websocket.url.path).inc()
+
+
+def ws_closed(websocket: WebSocket):
+    metrics.WS_CLIENTS.labels(websocket.url.path).dec()
+
+
+async def ws_send(websocket: WebSocket, msg: dict):
+    await websocket.send_json(msg)
+    metrics.WS_MESSAGES.labels(websocket.url.path).inc()
+
+
+async def ws_send_cached(websocket: WebSocket, *keys):
+    """First message on a new stream: the last saved values, marked stale."""
+    entries = {k: warm_start.get(k) for k in keys}
+    if not any(entries.values()):
+        return
+    if len(keys) == 1:
+        msg = entries[keys[0]]
+    else:
+        saved = [e["saved_at"] for e in entries.values() if e]
+        msg = {"stale": True, "saved_at": min(saved),
+               **{k: e for k, e in entries.items() if e}}
+    await ws_send(websocket, msg)
+
+
+def ws_outbox(websocket: WebSocket) -> LatestOutbox:
+    """Latest-value sender, so a slow client only skips frames."""
+    return LatestOutbox(lambda msg: ws_send(websocket, msg),
+                        on_drop=metrics.WS_DROPPED.labels(websocket.url.path).inc)
+
+
+# =========================================================
+# Frontend (same origin as the API)
+# =========================================================
+@app.get("/", include_in_schema=False)
+@app.get("/index.html", include_in_schema=False)
+def frontend_index(request: Request):
+    if frontend.index is None:
+        raise HTTPException(404, "Frontend not available")
+    return frontend.index_response(request.headers.get("accept-encoding", ""),
+                                   request.headers.get("if-none-match"))
+
+
+@app.get("/assets/{name}", include_in_schema=False)
+def frontend_asset(name: str, request: Request):
+    resp = frontend.asset_response(name, request.headers.get("accept-encoding", ""),
+                                   request.headers.get("if-none-match"))
+    if resp is None:
+        raise HTTPException(404, "Not found")
+    return resp
+
+
 # =========================================================
 # REST: Base / existing
 # =========================================================
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Prometheus text format. Link metrics come from the gateway when one is used."""
+    text = metrics.render()
+    if gateway:
+        try:
+            text += gateway.metrics()
+        except Exception as e:
+            text += f"# gateway metrics unavailable: {e}\n"
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+# =========================================================
+# REST: Events
+# =========================================================
+# async: the engine is fed by show_feed on the event loop, so it is only
+# ever read and changed there (a threadpool read could see it mid-append)
+@app.get("/api/events")
+async def events(since: int = 0, limit: int = 100):
+    """Bounded event log (oldest first) plus the rules currently raised."""
+    return {"events": event_engine.recent(since, limit), "active": event_engine.state()}
+
+
+@app.get("/api/events/rules")
+async def event_rules():
+    return {"rules": event_engine.rules}
+
+
+@app.put("/api/events/rules")
+async def set_event_rules(rules: List[EventRule]):
+    event_engine.set_rules([r.model_dump(exclude_none=True) for r in rules])
+    return {"rules": event_engine.rules}
+
+
+# =========================================================
+# REST: Rolling statistics
+# =========================================================
+# async: snapshot() expires samples, and on_frame adds them on the event loop
+@app.get("/api/stats")
+async def stats():
+    """AGC and pointing error min/max/mean/stddev over 1 s, 1 min and 1 h."""
+    return show_stats.snapshot()
+
+
+# =========================================================
+# REST: Telemetry history
+# =========================================================
+@app.get("/api/history")
+def history_query(since: Optional[float] = None, until: Optional[float] = None,
+                  fields: Optional[str] = None, resolution: Optional[float] = None,
+                  max_points: int = 1000, limit: int = 100000):
+    """
+    $show fields between since and until (unix time, default the last
+    hour), from raw frames or the 1s / 1m / 1h rollups: the coarsest tier
+    whose step meets `resolution` (seconds per point, default span /
+    max_points). fields = comma separated, default all numeric fields.
+    """
+    try:
+        names = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        return {**history.query(since, until, names, resolution, max_points, limit),
+                "dropped": history.dropped}
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+# =========================================================
+# REST: Warm-start snapshot
+# =========================================================
+@app.get("/api/snapshot")
+def snapshot():
+    """Last saved $show / sat / place / beacon / dvb replies, all marked stale."""
+    return warm_start.all()
+
+
+# =========================================================
+# REST: Log store
+# =========================================================
+@app.get("/api/logs")
+def logs(since: Optional[float] = None, code: Optional[str] = None,
+         level: Optional[str] = None, limit: int = 100, cursor: Optional[int] = None):
+    """
+    Newest first. since = unix time, level = minimum level (DEBUG for
+    every frame, WARNING for problems only); page back with cursor =
+    the previous response's next_cursor.
+    """
+    try:
+        return {**log_store.query(since, code, level, limit, cursor), "dropped": log_store.dropped}
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+# =========================================================
+# REST: Debug tracing
+# =========================================================
+@app.get("/api/debug/traces")
+def debug_traces(limit: int = 50):
+    """Most recent request traces, newest first, with per-phase totals in ms."""
+    return {"tracing": acu_trace.settings(), "traces": acu_trace.recent(limit)}
+
+
+@app.post("/api/debug/traces")
+def debug_traces_config(req: TracingReq):
+    acu_trace.configure(on=req.enabled, capacity=req.capacity)
+    if req.clear:
+        acu_trace.clear()
+    return {"tracing": acu_trace.settings()}
+
+
 @app.get("/api/ports")
 def ports():
+    if gateway:
+        return {"ports": gateway.list_ports()}
     return {"ports": acu_serial.list_ports()}
 
 
+@app.post("/api/discover")
+def discover_ports(req: DiscoverReq):
+    """
+    Find the ACU: every candidate port is probed at the same time with a
+    `get show` frame at each baud rate; ports that answer with a valid
+    checksum are returned.
+    """
+    try:
+        start = time.perf_counter()
+        if gateway:
+            res = gateway.discover(req.ports, req.baudrates, req.timeout)
+            found, probed = res["found"], res["probed"]
+        else:
+            skip = [acu_serial.ser.port] if acu_serial.is_connected() else []
+            found, probed = discover(req.ports, req.baudrates, req.timeout, skip=skip)
+
+        out = {"found": found, "probed": len(probed),
+               "elapsed": round(time.perf_counter() - start, 3)}
+
+        if req.auto_connect and found:
+            best = found[0]
+            out["connected"] = connect_serial(ConnectSerialReq(
+                port=best["device"], baudrate=best["baudrate"]))
+        return out
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(400, str(e))
+
+
 @app.get("/api/mode")
 def mode():
-    return {"mode": acu.mode}
+    return {"mode": link_state()["mode"]}
 
 
 @app.post("/api/connect_serial")
 def connect_serial(req: ConnectSerialReq):
     global acu
     try:
+        if gateway:
+            gateway.connect_serial(req.port, baudrate=req.baudrate, timeout=req.timeout,
+                                   coalesce_window=req.coalesce_window)
+            log.info("Connected serial %s @ %d (gateway)", req.port, req.baudrate)
+            return {"ok": True, "connected": True, "mode": "serial", "port": req.port}
+
         acu_serial.connect(req.port, baudrate=req.baudrate, timeout=req.timeout)
+        acu_serial.flights.window = req.coalesce_window
         acu = acu_serial
+        log.info("Connected serial %s @ %d", req.port, req.baudrate)
         return {"ok": True, "connected": True, "mode": "serial", "port": req.port}
     except Exception as e:
+        log.warning("Serial connect to %s failed: %s", req.port, e)
         raise HTTPException(400, str(e))
 
 
@@ -126,23 +565,35 @@ def connect_serial(req: ConnectSerialReq):
 def connect_tcp(req: ConnectTcpReq):
     global acu
     try:
-        tcp_acu.connect(req.host, req.port, timeout=req.timeout)
+        if gateway:
+            gateway.connect_tcp(req.host, req.port, timeout=req.timeout,
+                                coalesce_window=req.coalesce_window, window=req.window)
+            log.info("Connected TCP %s:%d (gateway)", req.host, req.port)
+            return {"ok": True, "connected": True, "mode": "tcp",
+                    "host": req.host, "port": req.port}
+
+        tcp_acu.connect(req.host, req.port, timeout=req.timeout, window=req.window)
+        tcp_acu.flights.window = req.coalesce_window
         acu = tcp_acu
+        log.info("Connected TCP %s:%d", req.host, req.port)
         return {"ok": True, "connected": True, "mode": "tcp",
                 "host": req.host, "port": req.port}
     except Exception as e:
+        log.warning("TCP connect to %s:%d failed: %s", req.host, req.port, e)
         raise HTTPException(400, str(e))
 
 
 @app.post("/api/disconnect")
 def disconnect():
     acu.disconnect()
-    return {"ok": True, "connected": False, "mode": acu.mode}
+    mode = link_state()["mode"]
+    log.info("Disconnected (%s)", mode)
+    return {"ok": True, "connected": False, "mode": mode}
 
 
 @app.get("/api/connected")
 def connected():
-    return {"connected": acu.is_connected(), "mode": acu.mode}
+    return link_state()
 
 
 @app.post("/api/send")
@@ -157,10 +608,79 @@ def send(req: SendReq):
         raise HTTPException(400, str(e))
 
 
+def polled_show(after: float, timeout: float = 3.0) -> str:
+    """
+    Next $show line from the shared poller whose request left after wall
+    time `after`, so callers get fresh readings without extra exchanges.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        snap = show_state.read()
+        if snap and snap["raw"] and snap["frame_time"] - (snap["rtt"] or 0.0) / 2 > after:
+            return snap["raw"]
+        time.sleep(0.01)
+    raise TimeoutError("No new $show frame from the poller")
+
+
+def frame_id(snap) -> str:
+    """Identity of a polled frame (its capture time in microseconds, hex)."""
+    return f"{int(snap['frame_time'] * 1e6):x}"
+
+
+def frame_timing(snap, parsed) -> dict:
+    """
+    When a polled frame was taken: `frame_time` is the host wall clock at
+    the round-trip midpoint (within rtt/2); `acu_time` is the frame's own
+    time field moved onto the host clock by the offset estimate.
+    """
+    clock = snap["clock"]
+    acu_time = parse_acu_time(parsed.get("time"))
+    return {
+        "frame_time": snap["frame_time"],
+        "rtt": snap["rtt"],
+        "acu_time": acu_time[0] - clock["offset"] if acu_time and clock else None,
+        "clock": clock,
+    }
+
+
 @app.get("/api/status")
-def status():
+async def status(request: Request, max_age: float = 1.0, wait: float = 0.0,
+                 since: Optional[str] = None):
+    """
+    Latest polled $show frame if it is at most `max_age` seconds old,
+    otherwise a live `get show` exchange.
+
+    Polled frames carry an ETag (also `frame_id` in the body). With
+    `If-None-Match` (or `?since=<frame_id>`) naming the current frame the
+    answer is 304, or with `?wait=<s>` (max 30) the request is held until a
+    newer frame arrives. Polling clients add no ACU traffic this way.
+    `max_age` is only checked on arrival: a held request never turns into
+    a live exchange, it ends with the newer frame or a 304.
+    """
+    known = since or request.headers.get("if-none-match", "").strip('"') or None
+    deadline = time.monotonic() + min(max(wait, 0.0), 30.0)
+
+    snap = show_state.read()
+    polled = (snap and snap["connected"] and snap["raw"]
+              and time.time() - snap["frame_time"] <= max_age)
+    while polled:
+        fid = frame_id(snap)
+        headers = {"ETag": f'"{fid}"', "Cache-Control": "no-cache"}
+        if fid != known:
+            parsed = parse_show(snap["raw"])
+            return JSONResponse({
+                "frame": SHOW_FRAME.strip(), "response": snap["raw"],
+                "parsed": parsed, "frame_id": fid,
+                "age": round(time.time() - snap["frame_time"], 3),
+                **frame_timing(snap, parsed),
+            }, headers=headers)
+        if time.monotonic() >= deadline:
+            return Response(status_code=304, headers=headers)
+        await asyncio.sleep(0.02)
+        snap = show_state.read() or snap
+
     try:
-        frame, resp = send_frame("cmd", "get show", [], retries=3, timeout=0.7)
+        frame, resp = await asyncio.to_thread(send_frame, "cmd", "get show", [], 3, 0.7)
         return {"frame": frame, "response": resp, "parsed": parse_show(resp)}
     except Exception as e:
         raise HTTPException(400, str(e))
@@ -178,19 +698,22 @@ def get_satellite():
         raise HTTPException(400, str(e))
 
 
+def sat_fields(req: SatSetReq) -> List[str]:
+    return [
+        req.name,
+        f"{req.center_freq:.2f}",
+        f"{req.carrier_freq:.2f}",
+        f"{req.carrier_rate:.2f}",
+        f"{req.sat_longitude:.2f}",
+        str(req.pol_mode),
+        f"{req.lock_threshold:.2f}",
+    ]
+
+
 @app.post("/api/satellite/set")
 def set_satellite(req: SatSetReq):
     try:
-        data = [
-            req.name,
-            f"{req.center_freq:.2f}",
-            f"{req.carrier_freq:.2f}",
-            f"{req.carrier_rate:.2f}",
-            f"{req.sat_longitude:.2f}",
-            str(req.pol_mode),
-            f"{req.lock_threshold:.2f}",
-        ]
-        frame, resp = send_frame("cmd", "sat", data, retries=3, timeout=1.0)
+        frame, resp = send_frame("cmd", "sat", sat_fields(req), retries=3, timeout=1.0)
         return {"frame": frame, "response": resp}
     except Exception as e:
         raise HTTPException(400, str(e))
@@ -208,13 +731,17 @@ def get_location():
         raise HTTPException(400, str(e))
 
 
+def place_fields(req: PlaceSetReq) -> List[str]:
+    data = [f"{req.longitude:.6f}", f"{req.latitude:.6f}"]
+    if req.heading is not None:
+        data.append(f"{req.heading:.2f}")
+    return data
+
+
 @app.post("/api/location/set")
 def set_location(req: PlaceSetReq):
     try:
-        data = [f"{req.longitude:.6f}", f"{req.latitude:.6f}"]
-        if req.heading is not None:
-            data.append(f"{req.heading:.2f}")
-        frame, resp = send_frame("cmd", "place", data, retries=3, timeout=1.0)
+        frame, resp = send_frame("cmd", "place", place_fields(req), retries=3, timeout=1.0)
         return {"frame": frame, "response": resp}
     except Exception as e:
         raise HTTPException(400, str(e))
@@ -241,6 +768,118 @@ def antenna_align_star():
         raise HTTPException(400, str(e))
 
 
+# Closed loops run inside the API worker. Behind a gateway every worker
+# would run its own copy against the one antenna, so they are refused.
+SINGLE_WORKER_ONLY = ("{} runs inside one API worker and is not available behind a "
+                      "gateway (ACU_GATEWAY_SOCKET); run a single worker that owns the link")
+
+
+def closed_loop():
+    """Name of the closed loop currently commanding the antenna, or None."""
+    if motion.enabled:
+        return "motion feed-forward"
+    if steptrack and steptrack.running():
+        return "step-track"
+    return None
+
+
+def refuse_if_closed_loop(what):
+    owner = closed_loop()
+    if owner:
+        raise HTTPException(409, f"{what} refused: {owner} is running")
+
+
+def stop_closed_loops():
+    """
+    End motion feed-forward and step-track, waiting for them to exit: a
+    stop from any client ends them too, or they would move the antenna
+    again. Returns whether either was running.
+    """
+    running = closed_loop() is not None
+    if motion.enabled:
+        motion.configure(False)
+    if steptrack and steptrack.running():
+        steptrack.stop()
+    return running
+
+
+@app.post("/api/antenna/steptrack")
+def antenna_steptrack(req: StepTrackReq):
+    """
+    Start a closed-loop AGC peak search around the current pointing.
+    Poll GET /api/antenna/steptrack for progress and the result.
+    """
+    global steptrack
+    if gateway:
+        raise HTTPException(409, SINGLE_WORKER_ONLY.format("Step-track"))
+    refuse_if_closed_loop("Step-track")
+
+    def send(frame_code, data):
+        return send_frame("cmd", frame_code, data, retries=2, timeout=1.0)
+
+    try:
+        steptrack = StepTrack(send, read_show=polled_show, poll=0.05, **req.model_dump())
+        steptrack.start()
+        return {"ok": True, "status": steptrack.status}
+    except StepTrackError as e:
+        raise HTTPException(409, str(e))
+
+
+@app.get("/api/antenna/steptrack")
+def antenna_steptrack_status():
+    if steptrack is None:
+        return {"status": {"state": "idle"}}
+    return {"status": steptrack.status}
+
+
+@app.post("/api/antenna/steptrack/stop")
+def antenna_steptrack_stop():
+    if steptrack is None or not steptrack.running():
+        return {"ok": True, "status": steptrack.status if steptrack else {"state": "idle"}}
+    steptrack.stop()
+    return {"ok": True, "status": steptrack.status}
+
+
+# =========================================================
+# REST: Vessel motion feed-forward
+# =========================================================
+@app.get("/api/motion")
+async def motion_status():  # async for the same reason as /api/stats
+    """Attitude prediction, prediction error and achieved pointing error (acu vs feedforward)."""
+    return motion.status()
+
+
+@app.post("/api/motion")
+def motion_configure(req: MotionReq):
+    """
+    Enable or disable anticipatory dirx corrections. Disabling leaves the
+    antenna where it was last commanded; restart ACU tracking as usual.
+    """
+    if gateway and req.enabled:
+        raise HTTPException(409, SINGLE_WORKER_ONLY.format("Motion feed-forward"))
+    if req.enabled and steptrack and steptrack.running():
+        raise HTTPException(409, "Motion feed-forward refused: step-track is running")
+    target = None
+    if req.target_az is not None and req.target_el is not None:
+        target = {"az": req.target_az, "el": req.target_el}
+    elif req.sat_longitude is not None:
+        target = {"sat_longitude": req.sat_longitude}
+    elif req.enabled:
+        try:
+            _, resp = send_frame("cmd", "get sat", [], retries=3, timeout=1.0)
+            target = {"sat_longitude": float(parse_sat(resp)["sat_longitude"])}
+        except Exception as e:
+            raise HTTPException(400, f"No target given and none read from the ACU: {e}")
+
+    try:
+        motion.configure(req.enabled, target, latency=req.latency,
+                         speed=req.speed, min_step=req.min_step)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    log.info("Motion feed-forward %s (target %s)", "enabled" if req.enabled else "disabled", target)
+    return {"ok": True, "status": motion.status()}
+
+
 @app.post("/api/antenna/collection")
 def antenna_collection():
     try:
@@ -273,27 +912,26 @@ def antenna_action(req: AntennaActionReq):
 # =========================================================
 # REST: Manual position + speed mode (dirx)
 # =========================================================
+def dirx_fields(req: DirxReq) -> List[str]:
+    """Fill-a-space: trailing None fields are simply left out."""
+    data = []
+    for v in (req.az_target, req.az_speed,
+              req.pitch_target, req.pitch_speed,
+              req.pol_target, req.pol_speed):
+        if v is not None:
+            data.append(f"{v:.2f}")
+    return data
+
+
 @app.post("/api/manual/dirx")
 def manual_dirx(req: DirxReq):
     """
     Uses protocol 'dirx' with 'fill a space' support:
     if a field is None -> not included at the end.
     """
+    refuse_if_closed_loop("Manual dirx")
     try:
-        data = [req.sport_type]
-
-        def add(v):
-            if v is None:
-                return
-            data.append(f"{v:.2f}")
-
-        add(req.az_target)
-        add(req.az_speed)
-        add(req.pitch_target)
-        add(req.pitch_speed)
-        add(req.pol_target)
-        add(req.pol_speed)
-
+        data = [req.sport_type] + dirx_fields(req)
         frame, resp = send_frame("cmd", "dirx", data, retries=3, timeout=1.5)
         return {"frame": frame, "response": resp}
     except Exception as e:
@@ -316,6 +954,7 @@ def manual_speed(req: ManualSpeedReq):
     Example:
       $cmd,manual,L,2.50,*hh
     """
+    refuse_if_closed_loop("Manual speed")
     try:
         data = [req.direction_code, f"{req.speed:.2f}"]
         frame, resp = send_frame("cmd", "manual", data, retries=3, timeout=1.0)
@@ -329,8 +968,15 @@ def manual_speed(req: ManualSpeedReq):
 # =========================================================
 @app.post("/api/stop")
 def stop():
+    """Stop the antenna, ending motion feed-forward and step-track too."""
     try:
-        frame, resp = send_frame("cmd", "stop", [], retries=3, timeout=1.0)
+        try:
+            frame, resp = send_frame("cmd", "stop", [], retries=3, timeout=1.0)
+        finally:
+            # stop first, then end the loops; stop again in case one of
+            # them had a command in flight meanwhile
+            if stop_closed_loops():
+                frame, resp = send_frame("cmd", "stop", [], retries=3, timeout=1.0)
         return {"frame": frame, "response": resp}
     except Exception as e:
         raise HTTPException(400, str(e))
@@ -352,63 +998,143 @@ def get_lo():
         raise HTTPException(400, str(e))
 
 
+def lo_fields(req) -> List[str]:
+    return [f"{req.lo_mhz:.0f}", f"{req.gain:.2f}"]
+
+
 @app.post("/api/lo/set")
 def set_lo(req: LOSetReq):
     try:
         code = "set beacon" if req.mode.lower() == "beacon" else "set dvb"
-        data = [f"{req.lo_mhz:.0f}", f"{req.gain:.2f}"]
-        frame, resp = send_frame("cmd", code, data, retries=3, timeout=1.0)
+        frame, resp = send_frame("cmd", code, lo_fields(req), retries=3, timeout=1.0)
         return {"frame": frame, "response": resp}
     except Exception as e:
         raise HTTPException(400, str(e))
 
 
+# =========================================================
+# REST: Configuration profiles
+# =========================================================
+@app.get("/api/profiles")
+def list_profiles():
+    return profiles.all()
+
+
+@app.get("/api/profiles/{name}")
+def get_profile(name: str):
+    profile = profiles.get(name)
+    if profile is None:
+        raise HTTPException(404, f"No profile named {name}")
+    return profile
+
+
+@app.put("/api/profiles/{name}")
+def put_profile(name: str, req: ProfileReq):
+    profile = req.model_dump(exclude_none=True)
+    if not profile:
+        raise HTTPException(400, "Profile sets nothing")
+    try:
+        profiles.put(name, profile)
+    except OSError as e:
+        raise HTTPException(500, f"Profile not saved: {e}")
+    return {"ok": True, "name": name, "profile": profile}
+
+
+@app.delete("/api/profiles/{name}")
+def delete_profile(name: str):
+    try:
+        found = profiles.delete(name)
+    except OSError as e:
+        raise HTTPException(500, f"Profiles not saved: {e}")
+    if not found:
+        raise HTTPException(404, f"No profile named {name}")
+    return {"ok": True, "name": name}
+
+
+@app.post("/api/profiles/{name}/apply")
+def apply_profile_endpoint(name: str):
+    """
+    Write every section of the profile back-to-back, then read them all
+    back once (get sat / place / beacon / dvb) and report the differences.
+    """
+    profile = profiles.get(name)
+    if profile is None:
+        raise HTTPException(404, f"No profile named {name}")
+    req = ProfileReq(**profile)
+
+    sections = {}
+    if req.sat:
+        sections["sat"] = sat_fields(req.sat)
+    if req.place:
+        sections["place"] = place_fields(req.place)
+    if req.beacon:
+        sections["beacon"] = lo_fields(req.beacon)
+    if req.dvb:
+        sections["dvb"] = lo_fields(req.dvb)
+
+    if not link_state()["connected"]:
+        raise HTTPException(400, "ACU not connected")
+
+    def send(frame_code, data):
+        return send_frame("cmd", frame_code, data, retries=3, timeout=1.0)
+
+    return {"name": name, **apply_profile(send, sections)}
+
+
 # =========================================================
 # WebSocket: existing SHOW stream
 # =========================================================
 @app.websocket("/ws/show")
 async def ws_show(websocket: WebSocket):
-    await websocket.accept()
-    print("WS /ws/show accepted")
+    await ws_accept(websocket)
+    log.info("WS /ws/show accepted")
 
-    interval_sec = 0.2  # 5 Hz
+    # frames come from the shared poller; this loop never talks to the ACU
+    last_seq = 0
+    outbox = ws_outbox(websocket)
 
     try:
+        cached = warm_start.get("show")
+        if cached:
+            await ws_send(websocket, {**cached, "frame": SHOW_FRAME.strip(),
+                                      "parsed": parse_show(cached["raw"])})
+
         while True:
-            if not acu.is_connected():
-                await websocket.send_json({
+            outbox.check()
+            snap = show_state.read()
+            if snap is None or snap["seq"] == last_seq:
+                await asyncio.sleep(0.02)
+                continue
+            last_seq = snap["seq"]
+
+            if not snap["connected"]:
+                outbox.put({
                     "connected": False,
-                    "mode": acu.mode,
+                    "mode": snap["mode"],
                     "note": "ACU not connected"
                 })
-                await asyncio.sleep(1.0)
-                continue
-
-            try:
-                frame = "$cmd,get show,*3f\r\n"
-                resp = await asyncio.to_thread(acu.send_and_read, frame, 3, 5)
-                parsed = parse_show(resp)
-
-                await websocket.send_json({
+            elif not snap["ok"]:
+                outbox.put({
                     "connected": True,
-                    "mode": acu.mode,
-                    "frame": frame.strip(),
-                    "raw": resp,
-                    "parsed": parsed
+                    "mode": snap["mode"],
+                    "error": snap["error"]
                 })
-
-            except Exception as e:
-                traceback.print_exc()
-                await websocket.send_json({
+            else:
+                parsed = parse_show(snap["raw"])
+                outbox.put({
                     "connected": True,
-                    "mode": acu.mode,
-                    "error": str(e)
+                    "mode": snap["mode"],
+                    "frame": SHOW_FRAME.strip(),
+                    "raw": snap["raw"],
+                    "parsed": parsed,
+                    **frame_timing(snap, parsed),
                 })
 
-            await asyncio.sleep(interval_sec)
-
     except WebSocketDisconnect:
-        print("WS /ws/show disconnected")
+        log.info("WS /ws/show disconnected (%d frames dropped)", outbox.dropped)
+    finally:
+        await outbox.close()
+        ws_closed(websocket)
 
 
 # =========================================================
@@ -416,26 +1142,34 @@ async def ws_show(websocket: WebSocket):
 # =========================================================
 @app.websocket("/ws/sat")
 async def ws_sat(websocket: WebSocket):
-    await websocket.accept()
-    print("WS /ws/sat accepted")
+    await ws_accept(websocket)
+    log.info("WS /ws/sat accepted")
+
+    outbox = ws_outbox(websocket)
 
     try:
+        await ws_send_cached(websocket, "sat")
+
         while True:
-            if not acu.is_connected():
-                await websocket.send_json({"connected": False})
+            outbox.check()
+            if not link_state()["connected"]:
+                outbox.put({"connected": False})
                 await asyncio.sleep(1)
                 continue
 
             try:
                 frame, resp = await asyncio.to_thread(send_frame, "cmd", "get sat", [], 3, 1.0)
-                await websocket.send_json({"connected": True, "frame": frame, "raw": resp})
+                outbox.put({"connected": True, "frame": frame, "raw": resp})
             except Exception as e:
-                await websocket.send_json({"connected": True, "error": str(e)})
+                outbox.put({"connected": True, "error": str(e)})
 
             await asyncio.sleep(1.0)
 
     except WebSocketDisconnect:
-        print("WS /ws/sat disconnected")
+        log.info("WS /ws/sat disconnected (%d messages dropped)", outbox.dropped)
+    finally:
+        await outbox.close()
+        ws_closed(websocket)
 
 
 # =========================================================
@@ -443,26 +1177,34 @@ async def ws_sat(websocket: WebSocket):
 # =========================================================
 @app.websocket("/ws/location")
 async def ws_location(websocket: WebSocket):
-    await websocket.accept()
-    print("WS /ws/location accepted")
+    await ws_accept(websocket)
+    log.info("WS /ws/location accepted")
+
+    outbox = ws_outbox(websocket)
 
     try:
+        await ws_send_cached(websocket, "place")
+
         while True:
-            if not acu.is_connected():
-                await websocket.send_json({"connected": False})
+            outbox.check()
+            if not link_state()["connected"]:
+                outbox.put({"connected": False})
                 await asyncio.sleep(1)
                 continue
 
             try:
                 frame, resp = await asyncio.to_thread(send_frame, "cmd", "get place", [], 3, 1.0)
-                await websocket.send_json({"connected": True, "frame": frame, "raw": resp})
+                outbox.put({"connected": True, "frame": frame, "raw": resp})
             except Exception as e:
-                await websocket.send_json({"connected": True, "error": str(e)})
+                outbox.put({"connected": True, "error": str(e)})
 
             await asyncio.sleep(1.0)
 
     except WebSocketDisconnect:
-        print("WS /ws/location disconnected")
+        log.info("WS /ws/location disconnected (%d messages dropped)", outbox.dropped)
+    finally:
+        await outbox.close()
+        ws_closed(websocket)
 
 
 # =========================================================
@@ -470,28 +1212,177 @@ async def ws_location(websocket: WebSocket):
 # =========================================================
 @app.websocket("/ws/lo")
 async def ws_lo(websocket: WebSocket):
-    await websocket.accept()
-    print("WS /ws/lo accepted")
+    await ws_accept(websocket)
+    log.info("WS /ws/lo accepted")
+
+    outbox = ws_outbox(websocket)
 
     try:
+        await ws_send_cached(websocket, "beacon", "dvb")
+
         while True:
-            if not acu.is_connected():
-                await websocket.send_json({"connected": False})
+            outbox.check()
+            if not link_state()["connected"]:
+                outbox.put({"connected": False})
                 await asyncio.sleep(1)
                 continue
 
             try:
                 f1, r1 = await asyncio.to_thread(send_frame, "cmd", "get beacon", [], 3, 1.0)
                 f2, r2 = await asyncio.to_thread(send_frame, "cmd", "get dvb", [], 3, 1.0)
-                await websocket.send_json({
+                outbox.put({
                     "connected": True,
                     "beacon": {"frame": f1, "raw": r1},
                     "dvb": {"frame": f2, "raw": r2},
                 })
             except Exception as e:
-                await websocket.send_json({"connected": True, "error": str(e)})
+                outbox.put({"connected": True, "error": str(e)})
 
             await asyncio.sleep(1.0)
 
     except WebSocketDisconnect:
-        print("WS /ws/lo disconnected")
+        log.info("WS /ws/lo disconnected (%d messages dropped)", outbox.dropped)
+    finally:
+        await outbox.close()
+        ws_closed(websocket)
+
+
+# =========================================================
+# WebSocket: low-latency manual jog control
+# =========================================================
+@app.websocket("/ws/control")
+async def ws_control(websocket: WebSocket):
+    """
+    Client -> server (JSON):
+      {"type": "speed", "direction_code": "L", "speed": 2.5}
+      {"type": "dirx", "sport_type": "a", "az_target": 10, "az_speed": 2}
+      {"type": "stop"}
+      {"type": "ping"}
+
+    Jog updates for the same axis are coalesced (latest wins) and sent at
+    a fixed rate; `stop` goes out immediately. If the client stays silent
+    for `deadman` seconds while jogging, the server sends `stop` itself.
+    Jogs are refused while motion feed-forward or step-track is running.
+    """
+    await ws_accept(websocket)
+    log.info("WS /ws/control accepted")
+
+    def send(frame_code, data):
+        if frame_code == "stop":
+            return send_frame("cmd", frame_code, data)
+        # a stale jog is worthless: one try, newer updates replace it anyway
+        return send_frame("cmd", frame_code, data, retries=1, timeout=0.5)
+
+    try:
+        interval = float(websocket.query_params.get("interval", 0.05))
+        deadman = float(websocket.query_params.get("deadman", 1.0))
+        sched = JogScheduler(send, on_result=lambda msg: ws_send(websocket, msg),
+                             interval=interval, deadman=deadman)
+    except ValueError as e:
+        await ws_send(websocket, {"error": f"Bad interval/deadman: {e}"})
+        await websocket.close(code=1008)
+        ws_closed(websocket)
+        return
+    sender = asyncio.create_task(sched.run())
+
+    try:
+        while True:
+            try:
+                msg = json.loads(await websocket.receive_text())
+                kind = str(msg.get("type", "")).lower()
+            except (ValueError, AttributeError):
+                await ws_send(websocket, {"error": "invalid message"})
+                continue
+
+            sched.touch()
+            try:
+                # a jog would fight the loop's own corrections; stop is always allowed
+                owner = closed_loop() if kind in ("speed", "dirx") else None
+                if owner:
+                    await ws_send(websocket, {"error": f"Jog refused: {owner} is running"})
+                elif kind == "speed":
+                    req = ManualSpeedReq(**{k: v for k, v in msg.items() if k != "type"})
+                    sched.jog_speed(req.direction_code, req.speed)
+                elif kind == "dirx":
+                    req = DirxReq(**{k: v for k, v in msg.items() if k != "type"})
+                    sched.jog_dirx(req.sport_type, dirx_fields(req))
+                elif kind == "stop":
+                    await sched.stop()
+                    # as POST /api/stop: end the closed loops, then stop again
+                    if await asyncio.to_thread(stop_closed_loops):
+                        await sched.stop()
+                elif kind == "ping":
+                    await ws_send(websocket, {"type": "pong",
+                                               "sent": sched.sent,
+                                               "coalesced": sched.coalesced})
+                else:
+                    await ws_send(websocket, {"error": f"Unknown type: {kind}"})
+            except Exception as e:
+                await ws_send(websocket, {"error": str(e)})
+
+    except WebSocketDisconnect:
+        log.info("WS /ws/control disconnected")
+    finally:
+        # stop first: cancelling a send mid-flight would let it land after the stop
+        await sched.close()
+        sender.cancel()
+        ws_closed(websocket)
+
+
+# =========================================================
+# WebSocket: alarm / state-change events
+# =========================================================
+@app.websocket("/ws/events")
+async def ws_events(websocket: WebSocket):
+    """
+    Compact events from the backend rule engine; `?since=<id>` replays the
+    log after that id first. No full frames are sent on this stream.
+    """
+    await ws_accept(websocket)
+    log.info("WS /ws/events accepted")
+
+    queue = event_engine.subscribe()
+    try:
+        since = int(websocket.query_params.get("since", -1))
+        if since >= 0:
+            for event in event_engine.recent(since, limit=event_engine.log.maxlen):
+                await ws_send(websocket, {"type": "event", **event})
+
+        while True:
+            event = await queue.get()
+            await ws_send(websocket, {"type": "event", **event})
+
+    except WebSocketDisconnect:
+        log.info("WS /ws/events disconnected")
+    finally:
+        event_engine.unsubscribe(queue)
+        ws_closed(websocket)
+
+
+# =========================================================
+# WebSocket: rolling statistics (low rate)
+# =========================================================
+@app.websocket("/ws/stats")
+async def ws_stats(websocket: WebSocket):
+    await ws_accept(websocket)
+    log.info("WS /ws/stats accepted")
+
+    try:
+        interval_sec = max(0.5, float(websocket.query_params.get("interval", 1.0)))
+    except ValueError as e:
+        await ws_send(websocket, {"error": f"Bad interval: {e}"})
+        await websocket.close(code=1008)
+        ws_closed(websocket)
+        return
+    outbox = ws_outbox(websocket)
+
+    try:
+        while True:
+            outbox.put(show_stats.snapshot())
+            await asyncio.sleep(interval_sec)
+
+    except WebSocketDisconnect:
+        log.info("WS /ws/stats disconnected (%d messages dropped)", outbox.dropped)
+    finally:
+        await outbox.close()
+        ws_closed(websocket)
@@ -0,0 +1,40 @@
+from acu_history import HistoryStore
+
+
+def frames(start, n, step=0.2):
+    return [(start + i * step, {"agc_level": float(i)}) for i in range(n)]
+
+
+def test_repeated_frames_are_stored_and_rolled_up_once(tmp_path):
+    store = HistoryStore(str(tmp_path / "h.sqlite3"))
+    batch = frames(1000.0, 10)
+    store.write(batch + batch[5:])  # the second half arrives twice
+    store.write(batch[:3])
+
+    db = store._db()
+    assert db.execute("SELECT COUNT(*) FROM raw").fetchone()[0] == 10
+    for tier in ("1s", "1m", "1h"):
+        total, n, agc_sum = db.execute(
+            f"SELECT SUM(count), SUM(agc_level_n), SUM(agc_level_sum) FROM rollup_{tier}").fetchone()
+        assert (total, n, agc_sum) == (10, 10, sum(range(10)))
+
+
+def test_rollup_aggregates_and_restart_carry_on(tmp_path):
+    path = str(tmp_path / "h.sqlite3")
+    HistoryStore(path).write(frames(1200.0, 3, step=1.0))  # agc 0, 1, 2
+    store = HistoryStore(path)                              # restart mid-minute
+    store.write([(1203.0, {"agc_level": 10.0}), (1201.5, {"agc_level": -1.0})])
+
+    items = store.query(since=1200.0, until=1259.0, fields=["agc_level"], resolution=60)["items"]
+    assert len(items) == 1 and items[0]["count"] == 5
+    assert items[0]["agc_level"] == {"min": -1.0, "max": 10.0, "mean": 12.0 / 5, "last": 10.0}
+
+
+def test_query_picks_coarsest_tier_meeting_resolution(tmp_path):
+    store = HistoryStore(str(tmp_path / "h.sqlite3"))
+    store.write(frames(0.0, 20, step=0.5))
+    assert store.query(since=0, until=10, resolution=0.1)["tier"] == "raw"
+    assert store.query(since=0, until=10, resolution=5)["tier"] == "1s"
+    assert store.query(since=0, until=3600, resolution=600)["tier"] == "1m"
+    raw = store.query(since=0, until=10, resolution=0.1, fields=["agc_level"])
+    assert [item["agc_level"] for item in raw["items"]] == [float(i) for i in range(20)]
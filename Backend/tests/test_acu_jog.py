@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+
+from acu_jog import JogScheduler
+
+
+class FakeLink:
+    """Serializes exchanges like the real drivers and records the wire order."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.wire = []
+
+    def send(self, frame_code, data):
+        with self.lock:
+            self.wire.append(" ".join([frame_code, *data]))
+            time.sleep(self.delay)
+            return frame_code, "ok"
+
+
+def test_stop_during_batch_drops_rest_of_batch():
+    async def scenario():
+        link = FakeLink()
+        sched = JogScheduler(link.send, interval=0.01, deadman=5.0)
+        sender = asyncio.create_task(sched.run())
+        sched.jog_speed("L", 2.0)
+        sched.jog_speed("U", 2.0)
+        await asyncio.sleep(0.02)  # "manual L" is in flight
+        await sched.stop()
+        await asyncio.sleep(0.2)
+        sender.cancel()
+        return link.wire, sched.moving
+
+    wire, moving = asyncio.run(scenario())
+    assert wire == ["manual L 2.00", "stop"]
+    assert moving is False
+
+
+def test_jog_after_stop_is_sent():
+    async def scenario():
+        link = FakeLink(delay=0.0)
+        sched = JogScheduler(link.send, interval=0.01, deadman=5.0)
+        sender = asyncio.create_task(sched.run())
+        await sched.stop()
+        sched.jog_speed("R", 1.0)
+        await asyncio.sleep(0.1)
+        sender.cancel()
+        return link.wire, sched.moving
+
+    wire, moving = asyncio.run(scenario())
+    assert wire == ["stop", "manual R 1.00"]
+    assert moving is True
+
+
+def test_rejects_non_positive_timing():
+    async def make(**kw):
+        return JogScheduler(lambda c, d: (c, "ok"), **kw)
+
+    for kw in ({"deadman": 0}, {"interval": -1}):
+        try:
+            asyncio.run(make(**kw))
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {kw}")
@@ -0,0 +1,38 @@
+import threading
+import time
+
+from acu_poller import SHOW_FRAME, PollRate, ShowPoller
+from acu_sim import SimServer
+from acu_state import ShowState
+from acu_tcp import ACUTcp
+
+
+def test_poller_never_republishes_a_shared_reply(tmp_path):
+    server = SimServer(rtt=0.02).start()
+    link = ACUTcp(coalesce_window=0.1)
+    link.connect(server.host, server.port, timeout=2.0)
+    frames = []
+    rate = PollRate(fast=0.05, normal=0.05, idle=0.05)
+    poller = ShowPoller(lambda: link, ShowState(str(tmp_path / "show.state")), rate=rate,
+                        consumers=[lambda parsed, frame_time: frames.append(frame_time)])
+    # a request-path reader keeps the coalescing cache warm meanwhile
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            link.send_and_read(SHOW_FRAME, 1, 1.0)
+            time.sleep(0.01)
+
+    threading.Thread(target=reader, daemon=True).start()
+    try:
+        poller.start()
+        time.sleep(1.0)
+    finally:
+        poller.stop()
+        stop.set()
+        link.disconnect()
+        server.close()
+
+    assert len(frames) >= 10
+    assert len(set(frames)) == len(frames)
+    assert rate.exchange_time >= 0.015  # real round trips, not cache hits
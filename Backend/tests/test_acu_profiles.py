@@ -0,0 +1,14 @@
+from acu_driver import build_frame
+from acu_profiles import diff_fields, reply_fields
+
+
+def test_reply_fields_keep_blank_positions():
+    assert reply_fields("$cmd,sat,A,B,C,*hh") == ["A", "B", "C"]
+    assert reply_fields("$cmd,sat,A,,C*hh") == ["A", "", "C"]
+    assert reply_fields(build_frame("cmd", "place", "106.8", "", "0")) == ["106.8", "", "0"]
+
+
+def test_blank_readback_field_does_not_shift_the_diff():
+    written = ["SAT1", "12000.00", "0.00", "113.00"]
+    read = reply_fields("$cmd,sat,SAT1,12000.0,,113.00,*hh")
+    assert diff_fields(written, read) == [{"index": 2, "written": "0.00", "read": ""}]
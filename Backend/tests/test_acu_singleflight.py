@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+from acu_singleflight import SingleFlight
+
+
+class Counter:
+    def __init__(self, delay=0.1, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return f"reply {self.calls}"
+
+
+def run_together(n, fn):
+    results = [None] * n
+
+    def worker(i):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+        time.sleep(0.005)
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_callers_share_one_exchange():
+    flights, fn = SingleFlight(), Counter()
+    results = run_together(5, lambda: flights.do("get show", fn))
+    assert fn.calls == 1
+    assert results == ["reply 1"] * 5
+
+
+def test_error_reaches_every_waiter_and_is_not_cached():
+    flights, fn = SingleFlight(window=1.0), Counter(error=TimeoutError("no reply"))
+    results = run_together(3, lambda: flights.do("get show", fn))
+    assert fn.calls == 1
+    assert all(isinstance(r, TimeoutError) for r in results)
+    with pytest.raises(TimeoutError):
+        flights.do("get show", fn)
+    assert fn.calls == 2
+
+
+def test_result_reused_within_window_only():
+    flights, fn = SingleFlight(window=0.1), Counter(delay=0.0)
+    assert flights.do("get show", fn) == "reply 1"
+    assert flights.do("get show", fn) == "reply 1"
+    assert flights.do("get sat", fn) == "reply 2"  # keys are separate
+    time.sleep(0.15)
+    assert flights.do("get show", fn) == "reply 3"
+
+
+def test_forget_detaches_flight_in_progress():
+    flights, fn = SingleFlight(window=1.0), Counter(delay=0.1)
+    first = threading.Thread(target=flights.do, args=("get show", fn))
+    first.start()
+    time.sleep(0.02)
+    flights.forget()  # e.g. a command was written meanwhile
+    assert flights.do("get show", fn) == "reply 2"
+    first.join()
+    assert flights.do("get show", fn) == "reply 2"  # the pre-forget reply was not cached
+
+
+def test_fresh_caller_runs_its_own_exchange_and_refreshes_cache():
+    flights, fn = SingleFlight(window=1.0), Counter(delay=0.0)
+    assert flights.do("get show", fn) == "reply 1"
+    assert flights.do("get show", fn, fresh=True) == "reply 2"
+    assert flights.do("get show", fn) == "reply 2"
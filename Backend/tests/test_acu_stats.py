@@ -0,0 +1,45 @@
+import random
+import statistics
+
+from acu_stats import ShowAggregator, WindowStats
+
+
+def test_window_matches_brute_force_as_samples_expire():
+    rng = random.Random(7)
+    ws = WindowStats(span=5.0)
+    seen = []
+    t = 0.0
+    for _ in range(500):
+        t += rng.uniform(0.0, 0.5)
+        x = rng.uniform(-50.0, 50.0)
+        ws.add(t, x)
+        seen.append((t, x))
+        live = [v for s, v in seen if s > t - 5.0]
+        summary = ws.summary()
+        assert summary["count"] == len(live)
+        assert (summary["min"], summary["max"]) == (min(live), max(live))
+        assert abs(summary["mean"] - statistics.fmean(live)) < 1e-3
+        assert abs(summary["stddev"] - statistics.pstdev(live)) < 1e-3
+
+
+def test_window_empties_after_span():
+    ws = WindowStats(span=1.0)
+    ws.add(10.0, 3.0)
+    ws.add(10.5, 5.0)
+    ws.expire(11.2)
+    assert ws.summary()["count"] == 1 and ws.summary()["min"] == 5.0
+    ws.expire(12.0)
+    assert ws.summary() == {"count": 0, "min": None, "max": None, "mean": None, "stddev": None}
+    ws.add(12.5, -1.0)
+    assert ws.summary()["mean"] == -1.0 and ws.summary()["stddev"] == 0.0
+
+
+def test_republished_frame_is_counted_once():
+    agg = ShowAggregator(windows={"1h": 3600.0})
+    frame = {"agc_level": "40.0", "preset_azimuth": "359.0", "current_azimuth": "1.0"}
+    agg.on_frame(frame, 1000.0)
+    agg.on_frame(frame, 1000.0)
+    agg.on_frame({**frame, "agc_level": "42.0"}, 1000.2)
+    agc = agg.stats["agc_level"]["1h"].summary()
+    assert agc["count"] == 2 and agc["mean"] == 41.0
+    assert agg.stats["az_error"]["1h"].summary()["min"] == -2.0  # wrapped, not 358
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from acu_driver import build_frame
+from acu_steptrack import StepTrack
+
+
+class FakeAntenna:
+    """Moves `rate` deg per reading towards the last dirx; AGC peaks at `peak`."""
+
+    def __init__(self, az=100.0, pitch=30.0, peak=(100.3, 29.9), rate=None):
+        self.az, self.pitch = az, pitch
+        self.target = (az, pitch)
+        self.peak = peak
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.sent = []
+
+    def send(self, frame_code, data):
+        with self.lock:
+            self.sent.append(frame_code)
+            if frame_code == "dirx":
+                self.target = (float(data[1]), float(data[3]))
+                if self.rate is None:
+                    self.az, self.pitch = self.target
+        return frame_code, "ok"
+
+    def read_show(self, after):
+        with self.lock:
+            if self.rate:
+                self.az += max(-self.rate, min(self.rate, self.target[0] - self.az))
+                self.pitch += max(-self.rate, min(self.rate, self.target[1] - self.pitch))
+            agc = 50.0 - 10.0 * ((self.az - self.peak[0]) ** 2 + (self.pitch - self.peak[1]) ** 2)
+            az, pitch = f"{self.az:.3f}", f"{self.pitch:.3f}"
+        return build_frame("show", az, pitch, "0.00", az, pitch, "0.00", "3", "10.0", "0.00",
+                           "0.00", "106.8", "-6.2", "1", "0", "0", f"{agc:.3f}", "512", "512",
+                           "2026-01-01 00:00:00")
+
+
+def wait_done(track, limit):
+    start = time.monotonic()
+    while track.running() and time.monotonic() - start < limit:
+        time.sleep(0.01)
+    return time.monotonic() - start
+
+
+def test_converges_on_agc_peak():
+    ant = FakeAntenna()
+    track = StepTrack(ant.send, read_show=ant.read_show, poll=0.0, dwell=0.0, step=0.2)
+    track.start()
+    wait_done(track, 5.0)
+    st = track.status
+    assert st["state"] == "converged"
+    assert abs(st["center"]["az"] - 100.3) < 0.05 and abs(st["center"]["pitch"] - 29.9) < 0.05
+
+
+def test_max_time_ends_run_inside_a_move():
+    # the antenna crawls, so every move would wait out the whole settle_timeout
+    ant = FakeAntenna(rate=0.0001)
+    track = StepTrack(ant.send, read_show=ant.read_show, poll=0.02, dwell=0.5,
+                      settle_timeout=3.0, max_time=0.3)
+    track.start()
+    took = wait_done(track, 5.0)
+    assert track.status["state"] == "timeout"
+    assert took < 0.6
+    assert ant.sent[-1] == "dirx"  # heading back to the best point found
+
+
+def test_stop_interrupts_settle_wait_and_stops_antenna():
+    ant = FakeAntenna(rate=0.0001)
+    track = StepTrack(ant.send, read_show=ant.read_show, poll=0.02, settle_timeout=3.0)
+    track.start()
+    time.sleep(0.1)
+    track.stop()
+    assert not track.running()
+    assert track.status["state"] == "stopped" and ant.sent[-1] == "stop"
@@ -0,0 +1,93 @@
+import random
+import time
+
+import pytest
+
+from acu_driver import build_frame
+from acu_sim import SimServer
+from acu_tcp import ACUTcp, _Pending, reply_key
+
+SCRIPT = [("get show", []), ("get sat", []), ("get place", []),
+          ("dirx", ["l", "120.00", "2.00", "30.00", "2.00"]), ("get beacon", [])]
+
+
+@pytest.fixture
+def sim():
+    servers = []
+
+    def start(**kw):
+        server = SimServer(**kw).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def frames(n):
+    return [build_frame("cmd", code, *data) for code, data in (SCRIPT * n)[:n]]
+
+
+def answered(requests, replies):
+    expect = {"get show": "show", "get sat": "sat", "get place": "place",
+              "dirx": "dirx", "get beacon": "beacon"}
+    return [reply_key(r) == expect[f.split(",")[1]] for f, r in zip(requests, replies)]
+
+
+def test_pipelined_batch_overlaps_round_trips(sim):
+    server = sim(rtt=0.05)
+    link = ACUTcp(window=8)
+    link.connect(server.host, server.port, timeout=2.0)
+    batch = frames(40)
+    start = time.perf_counter()
+    replies = link.send_many(batch, retries=1, timeout=2.0)
+    elapsed = time.perf_counter() - start
+    link.disconnect()
+    assert all(answered(batch, replies))
+    assert elapsed < 40 * 0.05 / 4  # stop-and-wait would take 2 s
+    assert link._limit == 8
+
+
+def test_out_of_order_replies_fall_back_and_still_answer_everything(sim):
+    random.seed(3)
+    server = sim(rtt=0.01, swap=0.2)
+    link = ACUTcp(window=8, fallback_hold=30.0)
+    link.connect(server.host, server.port, timeout=2.0)
+    batch = frames(40)
+    replies = link.send_many(batch, retries=3, timeout=1.0)
+    link.disconnect()
+    assert not [r for r in replies if isinstance(r, Exception)]
+    assert all(answered(batch, replies))
+    assert link._limit == 1  # ordering broke: one request in flight for a while
+
+
+def queue(link, *expects):
+    pending = [_Pending(e) for e in expects]
+    link._pending.extend(pending)
+    return pending
+
+
+def test_match_finishes_oldest_request_expecting_the_reply():
+    link = ACUTcp(window=4)
+    show1, sat, show2 = queue(link, "show", "sat", "show")
+    link._match(build_frame("show", "1").strip().encode(), (0.0, 0.0))
+    assert show1.line is not None and not sat.done.is_set() and not show2.done.is_set()
+    assert link._limit == 4
+
+
+def test_match_skipping_a_request_fails_it_and_drops_to_one_in_flight():
+    link = ACUTcp(window=4)
+    show, sat = queue(link, "show", "sat")
+    link._match(build_frame("cmd", "sat", "ok").strip().encode(), (0.0, 0.0))
+    assert isinstance(show.error, RuntimeError) and sat.line is not None
+    assert not link._pending and link._limit == 1
+
+
+def test_unmatched_reply_drops_to_one_in_flight_but_unsolicited_does_not():
+    link = ACUTcp(window=4)
+    link._match(build_frame("show", "1").strip().encode(), (0.0, 0.0))
+    assert link._limit == 4  # nothing in flight: dropped
+    (sat,) = queue(link, "sat")
+    link._match(build_frame("show", "1").strip().encode(), (0.0, 0.0))
+    assert not sat.done.is_set() and link._limit == 1
@@ -1,11 +1,14 @@
 // ============================
 // Config
 // ============================
-const API_BASE = "http://127.0.0.1:8000";
-const WS_URL   = "ws://127.0.0.1:8000/ws/show";
-const WS_SAT   = "ws://127.0.0.1:8000/ws/sat";
-const WS_PLACE = "ws://127.0.0.1:8000/ws/location";
-const WS_LO    = "ws://127.0.0.1:8000/ws/lo";
+// Same origin when served by the backend; fall back to a local backend
+// when index.html is opened straight from disk.
+const API_BASE = location.protocol.startsWith("http") ? location.origin : "http://127.0.0.1:8000";
+const WS_BASE  = API_BASE.replace(/^http/, "ws");
+const WS_URL   = `${WS_BASE}/ws/show`;
+const WS_SAT   = `${WS_BASE}/ws/sat`;
+const WS_PLACE = `${WS_BASE}/ws/location`;
+const WS_LO    = `${WS_BASE}/ws/lo`;
 
 // ============================
 // DOM
@@ -24,6 +27,12 @@ const logConsole       = document.getElementById("logConsole");
 const btnClearLog      = document.getElementById("btnClearLog");
 const btnCopyLog       = document.getElementById("btnCopyLog");
 
+const logHistory       = document.getElementById("logHistory");
+const logCode          = document.getElementById("logCode");
+const logLevel         = document.getElementById("logLevel");
+const btnLogSearch     = document.getElementById("btnLogSearch");
+const btnLogOlder      = document.getElementById("btnLogOlder");
+
 const toggleStream     = document.getElementById("toggleStream");
 
 const btnSendCustom    = document.getElementById("btnSendCustom");
@@ -70,10 +79,16 @@ const metricKeys = [
 // ============================
 // Helpers
 // ============================
+// live console keeps only the newest lines; history is paged from /api/logs
+const MAX_LOG_LINES = 500;
+
 function log(line){
   if(!logConsole) return;
   const ts = new Date().toLocaleTimeString();
-  logConsole.textContent += `[${ts}] ${line}\n`;
+  logConsole.appendChild(document.createTextNode(`[${ts}] ${line}\n`));
+  while(logConsole.childNodes.length > MAX_LOG_LINES){
+    logConsole.removeChild(logConsole.firstChild);
+  }
   logConsole.scrollTop = logConsole.scrollHeight;
 }
 
@@ -428,6 +443,37 @@ if(btnCopyLog){
   };
 }
 
+// Server log history (newest first, "Older" pages back)
+let logCursor = null;
+
+async function loadLogHistory(older=false){
+  if(!logHistory) return;
+  const q = new URLSearchParams({ limit: "200" });
+  const code = logCode?.value.trim();
+  if(code) q.set("code", code);
+  if(logLevel?.value) q.set("level", logLevel.value);
+  if(older){
+    if(logCursor === null) return;
+    q.set("cursor", logCursor);
+  }
+  try{
+    const res = await apiGet(`/api/logs?${q}`);
+    const text = res.items.map(r=>{
+      const ts = new Date(r.time * 1000).toLocaleTimeString();
+      return `[${ts}] ${r.level.padEnd(7)} ${r.message}\n`;
+    }).join("");
+    if(older) logHistory.appendChild(document.createTextNode(text));
+    else logHistory.textContent = text;
+    logCursor = res.next_cursor;
+    if(btnLogOlder) btnLogOlder.disabled = logCursor === null;
+  }catch(e){
+    log("Log history error: " + e.message);
+  }
+}
+
+if(btnLogSearch) btnLogSearch.onclick = ()=> loadLogHistory(false);
+if(btnLogOlder) btnLogOlder.onclick = ()=> loadLogHistory(true);
+
 // ============================
 // WebSockets
 // ============================
@@ -449,6 +495,13 @@ function startWsShow(){
     try{
       const data = JSON.parse(msg.data);
 
+      // last saved frame from the backend, until live ones arrive
+      if(data.stale){
+        if(data.parsed) fillMetrics(data.parsed);
+        log(`[WS][SHOW][CACHED] ${data.raw || ""}`);
+        return;
+      }
+
       if(data.connected === false){
         setStatus(false, data.mode || "-");
         return;
@@ -488,7 +541,7 @@ function startWsSat(){
 
       if(data.raw){
         satRaw.textContent = data.raw;
-        log(`[WS][SAT] ${data.raw}`);
+        log(`[WS][SAT]${data.stale ? "[CACHED]" : ""} ${data.raw}`);
       }
       if(data.error) log(`[WS][SAT][ERR] ${data.error}`);
     }catch(e){
@@ -514,7 +567,7 @@ function startWsPlace(){
 
       if(data.raw){
         placeRaw.textContent = data.raw;
-        log(`[WS][PLACE] ${data.raw}`);
+        log(`[WS][PLACE]${data.stale ? "[CACHED]" : ""} ${data.raw}`);
       }
       if(data.error) log(`[WS][PLACE][ERR] ${data.error}`);
     }catch(e){
@@ -541,7 +594,7 @@ function startWsLo(){
       if(data.beacon?.raw || data.dvb?.raw){
         loRaw.textContent =
           `BEACON:\n${data.beacon?.raw || "-"}\n\nDVB:\n${data.dvb?.raw || "-"}`;
-        log(`[WS][LO] beacon=${data.beacon?.raw || "-"} dvb=${data.dvb?.raw || "-"}`);
+        log(`[WS][LO]${data.stale ? "[CACHED]" : ""} beacon=${data.beacon?.raw || "-"} dvb=${data.dvb?.raw || "-"}`);
       }
       if(data.error) log(`[WS][LO][ERR] ${data.error}`);
     }catch(e){
@@ -563,6 +616,7 @@ startWsLo();
 
 setStatus(false,"-");
 showPage("dashboard");
+loadLogHistory();
 log("UI ready.");
 
 const savedTheme = localStorage.getItem("theme");